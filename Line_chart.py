@@ -1,15 +1,62 @@
+import atexit
+import hashlib
 import json
 import os
-import sys
+import shutil
+import tempfile
+import threading
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk, messagebox, filedialog, colorchooser
 
 import matplotlib
 matplotlib.use("TkAgg")
-from matplotlib import rcParams
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.colors import same_color
 from matplotlib.figure import Figure
-from matplotlib.ticker import MaxNLocator
+from matplotlib.patches import Rectangle
+import numpy as np
+
+from chart_branding import BRANDING_SIZES, branding_image, resource_path
+from chart_colors import SERIES_PALETTE, blend_color, normalize_color
+from chart_export import export_filetypes, write_series
+from chart_history import ChartHistory, ChartState, share_state
+from chart_pipeline import (
+    DEGRADED_POINTS,
+    DERIVED_KINDS,
+    MEMORY_BUDGET_MB,
+    PEAK_DIRECTIONS,
+    RESAMPLE_METHODS,
+    TEXT_COPY_FACTOR,
+    MemoCache,
+    MemoryMonitor,
+    StoredValues,
+    XGrid,
+    build_settings,
+    cache_key,
+    clear_caches,
+    decimate_panel,
+    derive_series,
+    draw_panel,
+    minmax_decimate,
+    panel_nbytes,
+    parse_csv_numbers,
+    parse_csv_strings,
+    parse_excel_block,
+    parse_interval_notes,
+    parse_paired_columns,
+    parse_series_values,
+    parsed_block_nbytes,
+    prepare_panel,
+    process_series,
+    refresh_lod,
+    series_nbytes,
+    series_values,
+    share_x_grid,
+    validate_series,
+)
+from chart_stream import FileTailSource, StreamSeries
+from chart_themes import DEFAULT_THEME, THEME_LABELS, clear_data, compile_theme, style_axes, theme_context
 
 try:
     from PIL import Image, ImageTk
@@ -17,183 +64,50 @@ except ImportError:
     Image = None
     ImageTk = None
 
-rcParams["font.sans-serif"] = ["PingFang TC", "Microsoft JhengHei", "Noto Sans CJK TC", "SimHei", "Arial Unicode MS"]
-rcParams["axes.unicode_minus"] = False
-
-
-def resource_path(relative_path):
-    base_path = getattr(sys, "_MEIPASS", os.path.abspath(os.path.dirname(__file__)))
-    return os.path.join(base_path, relative_path)
-
-
-def parse_csv_numbers(text, label):
-    raw = [item.strip() for item in text.split(",") if item.strip()]
-    if not raw:
-        raise ValueError(f"{label} 內容為空")
-    try:
-        return [float(item) for item in raw]
-    except ValueError as exc:
-        raise ValueError(f"{label} 含有非數字") from exc
-
-
-def parse_csv_strings(text, label):
-    items = [item.strip() for item in text.split(",") if item.strip()]
-    if not items:
-        raise ValueError(f"{label} 內容為空")
-    return items
-
-
-def parse_interval_notes(text):
-    notes = []
-    for line in text.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        parts = [p.strip() for p in line.split(",")]
-        if len(parts) < 3:
-            raise ValueError("區間備註格式需為：起點,終點,備註")
-        start = parts[0]
-        end = parts[1]
-        label = ",".join(parts[2:])
-        notes.append((start, end, label))
-    return notes
-
-
-def parse_excel_block(text):
-    rows = [row for row in text.splitlines() if row.strip()]
-    if not rows:
-        raise ValueError("Excel 貼上內容為空")
-
-    def clean_row(row):
-        return [cell.strip() for cell in row.split("\t")]
-
-    def is_number(value):
-        try:
-            float(value)
-        except ValueError:
-            return False
-        return True
-
-    table = [clean_row(row) for row in rows]
-    if len(table) < 2:
-        raise ValueError("Excel 貼上需至少包含標題列與一列數據")
-
-    max_cols = max(len(row) for row in table)
-    for row in table:
-        if len(row) < max_cols:
-            row.extend([""] * (max_cols - len(row)))
-    empty_cols = [idx for idx in range(max_cols) if all(row[idx] == "" for row in table)]
-    if empty_cols:
-        table = [[cell for idx, cell in enumerate(row) if idx not in empty_cols] for row in table]
-
-    header = table[0]
-    data_rows = table[1:]
-    has_header = any(cell and not is_number(cell) for cell in header)
-
-    x_items = []
-    x_values = []
-    x_unit = ""
-    series_defs = []
-    series_names = set()
-
-    if has_header:
-        header = [cell.strip() for cell in header if cell.strip() != ""]
-        if len(header) < 2:
-            raise ValueError("Excel 標題列需包含 X 與至少一個序列名稱")
-
-        max_cols = max(len(row) for row in data_rows)
-        if len(header) % 2 == 0 and max_cols >= len(header):
-            valid_xy = True
-            for row in data_rows:
-                for idx in range(len(header)):
-                    if idx >= len(row) or row[idx] == "":
-                        continue
-                    if not is_number(row[idx]):
-                        valid_xy = False
-                        break
-                if not valid_xy:
-                    break
-            if valid_xy:
-                pairs = len(header) // 2
-                x_candidates = []
-                for pair_idx in range(pairs):
-                    x_col = pair_idx * 2
-                    y_col = x_col + 1
-                    x_vals = []
-                    y_vals = []
-                    for row in data_rows:
-                        if len(row) <= y_col:
-                            continue
-                        x_cell = row[x_col]
-                        y_cell = row[y_col]
-                        if x_cell == "" or y_cell == "":
-                            continue
-                        if not (is_number(x_cell) and is_number(y_cell)):
-                            continue
-                        x_vals.append(x_cell)
-                        y_vals.append(y_cell)
-                    if not x_vals or not y_vals or len(x_vals) != len(y_vals):
-                        continue
-                    series_name = header[y_col] or f"序列 {pair_idx + 1}"
-                    if series_name in series_names:
-                        series_name = f"{series_name}-{pair_idx + 1}"
-                    series_names.add(series_name)
-                    series_defs.append((series_name, ",".join(y_vals), [str(v) for v in x_vals]))
-                    x_candidates.append(x_vals)
-                    if not x_unit and header[x_col] and not is_number(header[x_col]):
-                        x_unit = header[x_col]
-
-                if not series_defs:
-                    raise ValueError("Excel 貼上內容缺少可用的數據列")
-
-                first_x = x_candidates[0]
-                x_values = first_x
-                x_items = first_x
-            else:
-                x_items = header[1:]
-                for row in data_rows:
-                    if not row or len(row) < 2:
-                        continue
-                    name = row[0].strip() or "序列"
-                    values = [cell.strip() for cell in row[1:] if cell.strip() != ""]
-                    if not values:
-                        continue
-                    series_defs.append((name, ",".join(values), None))
-        else:
-            x_items = header[1:]
-            for row in data_rows:
-                if not row or len(row) < 2:
-                    continue
-                name = row[0].strip() or "序列"
-                values = [cell.strip() for cell in row[1:] if cell.strip() != ""]
-                if not values:
-                    continue
-                series_defs.append((name, ",".join(values), None))
-    else:
-        first_row = table[0]
-        if len(first_row) < 2:
-            raise ValueError("Excel 貼上需至少包含 X 與 Y 兩欄")
-        if not all(is_number(cell) for cell in first_row[:2]):
-            raise ValueError("Excel 貼上內容格式不正確")
-        x_vals = []
-        y_vals = []
-        for row in table:
-            if len(row) < 2:
-                continue
-            if not (is_number(row[0]) and is_number(row[1])):
-                continue
-            x_vals.append(row[0])
-            y_vals.append(row[1])
-        if not x_vals or not y_vals:
-            raise ValueError("Excel 貼上內容缺少數據列")
-        x_values = x_vals
-        x_items = x_vals
-        series_defs.append(("序列 1", ",".join(y_vals), [str(v) for v in x_vals]))
-
-    if not series_defs:
-        raise ValueError("Excel 貼上內容缺少數據列")
-
-    return x_items, x_values, x_unit, series_defs
+PANEL_LAYOUTS = {
+    "單一圖表": (1, 1),
+    "1×2": (1, 2),
+    "2×1": (2, 1),
+    "2×2": (2, 2),
+    "3×3": (3, 3),
+}
+STREAM_DRAW_INTERVAL_MS = 100
+STREAM_POLL_INTERVAL_MS = 200
+PREVIEW_CACHE_BUDGET_MB = 256
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+OVERVIEW_BUCKETS = 800
+STARTUP_CHECK_ENV = "LINECHART_STARTUP_CHECK"
+CHART_STATE_FIELDS = (
+    "x_items_var",
+    "x_values_var",
+    "x_unit_var",
+    "x_unit_enabled_var",
+    "y_unit_var",
+    "y_unit_enabled_var",
+    "interval_var",
+    "ymin_var",
+    "ymax_var",
+    "allow_negative_var",
+    "line_color_var",
+    "auto_color_var",
+    "chart_bg_var",
+    "export_ratio_var",
+    "layout_var",
+    "share_x_var",
+    "share_y_var",
+    "peaks_enabled_var",
+    "peak_direction_var",
+    "peak_prominence_var",
+    "peak_width_var",
+    "peak_count_var",
+    "processed_view_var",
+    "theme_var",
+    "derived_var",
+    "resample_var",
+    "excel_summary_var",
+)
+CHART_STATE_TEXTS = ("notes_text", "excel_text")
+SERIES_STATE_FIELDS = ("enabled_var", "name_var", "values_var", "panel_var", "smooth_var", "baseline_var")
 
 
 class SeriesRow:
@@ -202,16 +116,64 @@ class SeriesRow:
         self.enabled_var = tk.BooleanVar(value=True)
         self.name_var = tk.StringVar(value=f"序列 {index}")
         self.values_var = tk.StringVar()
+        self.panel_var = tk.StringVar(value="1")
+        self.smooth_var = tk.StringVar()
+        self.baseline_var = tk.StringVar()
         self.x_values = None
+        self.stored = None
+        self.values_snapshot = None
+        self.values_var.trace_add("write", self.forget_values)
 
         ttk.Checkbutton(self.frame, variable=self.enabled_var).grid(row=0, column=0, padx=4)
         ttk.Entry(self.frame, textvariable=self.name_var, width=14).grid(row=0, column=1, padx=4)
         ttk.Entry(self.frame, textvariable=self.values_var, width=40).grid(row=0, column=2, padx=4)
-        ttk.Button(self.frame, text="移除", command=remove_callback).grid(row=0, column=3, padx=4)
+        ttk.Spinbox(self.frame, from_=1, to=9, textvariable=self.panel_var, width=3).grid(row=0, column=3, padx=4)
+        ttk.Entry(self.frame, textvariable=self.smooth_var, width=4).grid(row=0, column=4, padx=4)
+        ttk.Entry(self.frame, textvariable=self.baseline_var, width=4).grid(row=0, column=5, padx=4)
+        ttk.Button(self.frame, text="移除", command=remove_callback).grid(row=0, column=6, padx=4)
 
     def grid(self, **kwargs):
         self.frame.grid(**kwargs)
 
+    def panel_index(self, panel_count):
+        try:
+            index = int(self.panel_var.get()) - 1
+        except ValueError:
+            index = 0
+        return min(max(index, 0), panel_count - 1)
+
+    def forget_values(self, *_args):
+        self.values_snapshot = None
+
+    def values_text(self):
+        if self.values_snapshot is None:
+            self.values_snapshot = self.values_var.get()
+        return self.values_snapshot
+
+    def values(self):
+        text = self.values_text()
+        if self.stored is not None and text == self.stored.summary():
+            return self.stored
+        return text
+
+    def processing(self):
+        name = self.name_var.get() or "序列"
+        smooth = self.smooth_var.get().strip()
+        baseline = self.baseline_var.get().strip()
+        if not smooth and not baseline:
+            return None
+        window = None
+        degree = None
+        if smooth:
+            if not smooth.isdigit() or int(smooth) < 3:
+                raise ValueError(f"{name} 平滑視窗需為 3 以上的整數")
+            window = int(smooth) | 1
+        if baseline:
+            if not baseline.isdigit() or int(baseline) > 10:
+                raise ValueError(f"{name} 基線階數需為 0~10 的整數")
+            degree = int(baseline)
+        return window, degree
+
     def destroy(self):
         self.frame.destroy()
 
@@ -252,7 +214,6 @@ class LineChartApp:
 
         self.app_icon = None
         self.banner_image = None
-        self.load_branding()
 
         main = ttk.Frame(root, padding=14)
         main.grid(row=0, column=0, sticky="nsew")
@@ -261,12 +222,9 @@ class LineChartApp:
 
         header = ttk.Frame(main)
         header.grid(row=0, column=0, columnspan=2, sticky="w", pady=(0, 10))
-        title_col = 0
-        if self.banner_image:
-            ttk.Label(header, image=self.banner_image).grid(row=0, column=0, padx=(0, 10))
-            title_col = 1
+        self.banner_label = ttk.Label(header)
         title = ttk.Label(header, text="折線圖設定面板", style="Header.TLabel")
-        title.grid(row=0, column=title_col, sticky="w")
+        title.grid(row=0, column=1, sticky="w")
 
         pane = ttk.PanedWindow(main, orient="horizontal")
         pane.grid(row=1, column=0, columnspan=2, sticky="nsew")
@@ -361,8 +319,15 @@ class LineChartApp:
         ttk.Label(config, text="支援：X,Y 兩欄｜或 X1,Y1,X2,Y2 成對欄位", style="Hint.TLabel").grid(
             row=15, column=1, columnspan=3, sticky="w", pady=(0, 6)
         )
-        ttk.Button(config, text="從 Excel 貼上套用", style="Accent.TButton", command=self.apply_excel).grid(
-            row=16, column=1, sticky="w", pady=(0, 6)
+        excel_actions = ttk.Frame(config)
+        excel_actions.grid(row=16, column=1, columnspan=3, sticky="w", pady=(0, 6))
+        ttk.Button(excel_actions, text="從 Excel 貼上套用", style="Accent.TButton", command=self.apply_excel).grid(
+            row=0, column=0, sticky="w"
+        )
+        ttk.Button(excel_actions, text="從剪貼簿貼上並套用", command=self.apply_clipboard).grid(row=0, column=1, sticky="w", padx=(6, 0))
+        self.excel_summary_var = tk.StringVar()
+        ttk.Label(excel_actions, textvariable=self.excel_summary_var, style="Hint.TLabel").grid(
+            row=1, column=0, columnspan=2, sticky="w", pady=(4, 0)
         )
 
         ttk.Separator(config).grid(row=17, column=0, columnspan=4, sticky="we", pady=6)
@@ -370,7 +335,7 @@ class LineChartApp:
         self.notes_text = tk.Text(config, width=52, height=5)
         self.notes_text.grid(row=18, column=1, columnspan=3, sticky="we", pady=2)
         self.notes_text.configure(background="#1c1536", foreground="#f8f7ff", insertbackground="#f8f7ff", relief="solid", borderwidth=1)
-        ttk.Label(config, text="格式：起點,終點,備註　例：1,3,促銷期（可填X數值/項目名稱/序號）", style="Hint.TLabel").grid(
+        ttk.Label(config, text="格式：起點,終點,備註　例：1,3,促銷期（可填X數值/項目名稱/序號；多圖可加 [圖號] 前綴）", style="Hint.TLabel").grid(
             row=19, column=1, columnspan=3, sticky="w", pady=(0, 6)
         )
 
@@ -397,6 +362,63 @@ class LineChartApp:
         self.export_ratio_box.grid(row=2, column=1, sticky="w", pady=(6, 0))
         ttk.Label(style_panel, text="直式可自行切換", style="Hint.TLabel").grid(row=2, column=3, sticky="w", pady=(6, 0))
 
+        ttk.Label(style_panel, text="版面配置").grid(row=3, column=0, sticky="w", pady=(6, 0))
+        self.layout_var = tk.StringVar(value="單一圖表")
+        layout_box = ttk.Combobox(style_panel, textvariable=self.layout_var, state="readonly", width=12)
+        layout_box["values"] = tuple(PANEL_LAYOUTS)
+        layout_box.grid(row=3, column=1, sticky="w", pady=(6, 0))
+        self.share_x_var = tk.BooleanVar(value=True)
+        self.share_y_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(style_panel, text="共用 X 軸", variable=self.share_x_var).grid(row=3, column=2, sticky="w", pady=(6, 0))
+        ttk.Checkbutton(style_panel, text="共用 Y 軸", variable=self.share_y_var).grid(row=3, column=3, sticky="w", pady=(6, 0))
+        ttk.Label(style_panel, text="多圖時於序列「圖表」欄指定圖號", style="Hint.TLabel").grid(
+            row=4, column=1, columnspan=4, sticky="w", pady=(2, 0)
+        )
+
+        self.peaks_enabled_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(style_panel, text="標示峰值", variable=self.peaks_enabled_var).grid(row=5, column=0, sticky="w", pady=(6, 0))
+        self.peak_direction_var = tk.StringVar(value="自動")
+        peak_direction_box = ttk.Combobox(style_panel, textvariable=self.peak_direction_var, state="readonly", width=12)
+        peak_direction_box["values"] = PEAK_DIRECTIONS
+        peak_direction_box.grid(row=5, column=1, sticky="w", pady=(6, 0))
+        peak_params = ttk.Frame(style_panel)
+        peak_params.grid(row=6, column=0, columnspan=5, sticky="w", pady=(4, 0))
+        ttk.Label(peak_params, text="突出度").grid(row=0, column=0, sticky="w")
+        self.peak_prominence_var = tk.StringVar()
+        ttk.Entry(peak_params, textvariable=self.peak_prominence_var, width=8).grid(row=0, column=1, sticky="w", padx=(4, 12))
+        ttk.Label(peak_params, text="最小寬度（點）").grid(row=0, column=2, sticky="w")
+        self.peak_width_var = tk.StringVar()
+        ttk.Entry(peak_params, textvariable=self.peak_width_var, width=6).grid(row=0, column=3, sticky="w", padx=(4, 12))
+        ttk.Label(peak_params, text="最多").grid(row=0, column=4, sticky="w")
+        self.peak_count_var = tk.StringVar(value="10")
+        ttk.Entry(peak_params, textvariable=self.peak_count_var, width=6).grid(row=0, column=5, sticky="w", padx=(4, 0))
+        ttk.Label(style_panel, text="突出度留空自動取資料範圍 5%；寬度以半突出度處計算", style="Hint.TLabel").grid(
+            row=7, column=1, columnspan=4, sticky="w", pady=(2, 0)
+        )
+
+        ttk.Label(style_panel, text="主題").grid(row=8, column=0, sticky="w", pady=(6, 0))
+        self.theme_var = tk.StringVar(value=next(label for label, name in THEME_LABELS.items() if name == DEFAULT_THEME))
+        theme_box = ttk.Combobox(style_panel, textvariable=self.theme_var, state="readonly", width=12)
+        theme_box["values"] = tuple(THEME_LABELS)
+        theme_box.grid(row=8, column=1, sticky="w", pady=(6, 0))
+        theme_box.bind("<<ComboboxSelected>>", lambda _event: self.apply_theme())
+        ttk.Label(style_panel, text="切換主題會改用該主題背景，立即套用", style="Hint.TLabel").grid(
+            row=8, column=2, columnspan=3, sticky="w", pady=(6, 0)
+        )
+
+        ttk.Label(style_panel, text="衍生序列").grid(row=9, column=0, sticky="w", pady=(6, 0))
+        self.derived_var = tk.StringVar(value=DERIVED_KINDS[0])
+        derived_box = ttk.Combobox(style_panel, textvariable=self.derived_var, state="readonly", width=12)
+        derived_box["values"] = DERIVED_KINDS
+        derived_box.grid(row=9, column=1, sticky="w", pady=(6, 0))
+        self.resample_var = tk.StringVar(value=RESAMPLE_METHODS[0])
+        resample_box = ttk.Combobox(style_panel, textvariable=self.resample_var, state="readonly", width=10)
+        resample_box["values"] = RESAMPLE_METHODS
+        resample_box.grid(row=9, column=2, sticky="w", pady=(6, 0))
+        ttk.Label(style_panel, text="X 不同時重取樣到第一條序列；差值、比值取前兩條", style="Hint.TLabel").grid(
+            row=10, column=1, columnspan=4, sticky="w", pady=(2, 0)
+        )
+
         series_frame = ttk.LabelFrame(config, text="資料序列", padding=8, style="Card.TLabelframe")
         series_frame.grid(row=21, column=0, columnspan=4, sticky="we", pady=(8, 4))
         header = ttk.Frame(series_frame)
@@ -404,6 +426,9 @@ class LineChartApp:
         ttk.Label(header, text="顯示", style="Hint.TLabel").grid(row=0, column=0, padx=6, sticky="w")
         ttk.Label(header, text="名稱", style="Hint.TLabel").grid(row=0, column=1, padx=6, sticky="w")
         ttk.Label(header, text="數值（逗號分隔）", style="Hint.TLabel").grid(row=0, column=2, padx=6, sticky="w")
+        ttk.Label(header, text="圖表", style="Hint.TLabel").grid(row=0, column=3, padx=6, sticky="w")
+        ttk.Label(header, text="平滑", style="Hint.TLabel").grid(row=0, column=4, padx=6, sticky="w")
+        ttk.Label(header, text="基線", style="Hint.TLabel").grid(row=0, column=5, padx=6, sticky="w")
         self.series_container = ttk.Frame(series_frame)
         self.series_container.grid(row=1, column=0, sticky="we")
 
@@ -411,6 +436,13 @@ class LineChartApp:
         controls.grid(row=2, column=0, sticky="w", pady=(6, 0))
         ttk.Button(controls, text="新增序列", command=self.add_series).grid(row=0, column=0, padx=2)
         ttk.Button(controls, text="移除未勾選", command=self.remove_unchecked).grid(row=0, column=1, padx=2)
+        self.processed_view_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(controls, text="顯示處理後數據", variable=self.processed_view_var).grid(row=0, column=2, padx=(10, 2))
+        self.memory_var = tk.StringVar()
+        ttk.Label(controls, textvariable=self.memory_var, style="Hint.TLabel").grid(row=0, column=3, padx=(10, 2))
+        ttk.Label(series_frame, text="平滑：Savitzky–Golay 視窗點數；基線：扣除的多項式階數（留空不處理）", style="Hint.TLabel").grid(
+            row=3, column=0, sticky="w", pady=(4, 0)
+        )
 
         actions = ttk.Frame(config)
         actions.grid(row=22, column=0, columnspan=4, sticky="e", pady=(10, 0))
@@ -419,16 +451,69 @@ class LineChartApp:
         ttk.Button(actions, text="清除", command=self.clear).grid(row=0, column=2, padx=4)
         ttk.Button(actions, text="重置", command=self.reset).grid(row=0, column=3, padx=4)
         ttk.Button(actions, text="下載圖片", style="Accent.TButton", command=self.save_image).grid(row=0, column=4, padx=4)
+        ttk.Button(actions, text="匯出資料", command=self.export_data).grid(row=0, column=5, padx=4)
+        ttk.Button(actions, text="復原", command=self.undo).grid(row=0, column=6, padx=(12, 4))
+        ttk.Button(actions, text="重做", command=self.redo).grid(row=0, column=7, padx=4)
+        root.bind_all("<Control-z>", lambda _event: self.undo())
+        root.bind_all("<Control-y>", lambda _event: self.redo())
+        root.bind_all("<Control-Shift-Z>", lambda _event: self.redo())
+
+        live_panel = ttk.LabelFrame(config, text="即時資料", padding=8, style="Card.TLabelframe")
+        live_panel.grid(row=23, column=0, columnspan=4, sticky="we", pady=(8, 4))
+        ttk.Button(live_panel, text="監看檔案…", command=self.start_file_stream).grid(row=0, column=0, padx=(0, 4))
+        ttk.Button(live_panel, text="停止監看", command=self.stop_stream).grid(row=0, column=1, padx=4)
+        ttk.Label(live_panel, text="滾動視窗（X 寬度）").grid(row=0, column=2, sticky="w", padx=(8, 4))
+        self.stream_window_var = tk.StringVar()
+        ttk.Entry(live_panel, textvariable=self.stream_window_var, width=10).grid(row=0, column=3, sticky="w")
+        self.stream_status_var = tk.StringVar(value="可監看持續寫入的 TSV 檔（第一欄為 X）；留空視窗顯示全部")
+        ttk.Label(live_panel, textvariable=self.stream_status_var, style="Hint.TLabel").grid(
+            row=1, column=0, columnspan=4, sticky="w", pady=(4, 0)
+        )
 
         self.figure = Figure(figsize=(6, 4), dpi=100, facecolor="#1a1333")
         self.ax = self.figure.add_subplot(111)
         self.ax.set_facecolor("#1a1333")
+        self.axes = [self.ax]
+        self.panel_layout = (1, 1, False, False)
+        self.panel_cache = [None]
+        self.panel_drawn = [None]
+        self.stale_panels = {}
+        self.plot_executor = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+        self.streams = {}
+        self.stream_lines = {}
+        self.stream_lock = threading.Lock()
+        self.stream_dirty = False
+        self.stream_source = None
+        self.stream_tick_job = None
+        self.stream_poll_job = None
+        self.history = ChartHistory()
+        self.restoring_state = False
+        self.text_snapshots = {}
         self.canvas = FigureCanvasTkAgg(self.figure, master=plot_frame)
         self.canvas.get_tk_widget().grid(row=0, column=0, sticky="nsew")
         self.canvas.get_tk_widget().configure(background="#1a1333")
+        self.canvas.mpl_connect("resize_event", self.on_canvas_resize)
         plot_frame.rowconfigure(0, weight=1)
         plot_frame.columnconfigure(0, weight=1)
 
+        self.overview_figure = Figure(figsize=(6, 0.8), dpi=100)
+        self.overview_figure.patch.set_facecolor("#1a1333")
+        self.overview_ax = self.overview_figure.add_axes([0.005, 0.06, 0.99, 0.88])
+        self.overview_canvas = FigureCanvasTkAgg(self.overview_figure, master=plot_frame)
+        self.overview_canvas.get_tk_widget().configure(height=80, background="#1a1333")
+        self.overview_canvas.get_tk_widget().grid(row=1, column=0, sticky="we", pady=(6, 0))
+        self.overview_canvas.mpl_connect("button_press_event", self.on_overview_press)
+        self.overview_canvas.mpl_connect("motion_notify_event", self.on_overview_drag)
+        self.overview_canvas.mpl_connect("button_release_event", self.on_overview_release)
+        self.overview_canvas.mpl_connect("resize_event", lambda _event: self.draw_overview(None, force=True))
+        self.overview_key = None
+        self.overview_lines = []
+        self.overview_bounds = None
+        self.overview_style = ("#1a1333", "#ffffff")
+        self.overview_window = None
+        self.overview_background = None
+        self.overview_drag = None
+
         self.sample_excel_text = ""
         sample_config = {}
         config_path = resource_path("sample_data.json")
@@ -478,7 +563,17 @@ class LineChartApp:
         self.sample_chart_bg = "#ffffff"
         self.sample_export_ratio = "A4 橫式"
 
+        self.cache_budget_mb = PREVIEW_CACHE_BUDGET_MB
+        self.memory_budget_mb = MEMORY_BUDGET_MB
         if sample_config:
+            try:
+                self.cache_budget_mb = float(sample_config.get("cache_budget_mb", self.cache_budget_mb))
+            except (TypeError, ValueError):
+                pass
+            try:
+                self.memory_budget_mb = float(sample_config.get("memory_budget_mb", self.memory_budget_mb))
+            except (TypeError, ValueError):
+                pass
             excel_block = str(sample_config.get("excel_block", "")).strip()
             if excel_block:
                 self.sample_excel_text = excel_block
@@ -559,6 +654,10 @@ class LineChartApp:
                 self.sample_notes = ""
                 self.sample_series = series_defs
 
+        self.render_cache = MemoCache(max_bytes=int(self.cache_budget_mb * 1024 * 1024))
+        self.memory = MemoryMonitor(self.memory_budget_mb)
+        self.storage_dir = None
+
         self.default_x_items = self.sample_x_items
         self.default_x_values = self.sample_x_values
         self.default_x_unit = self.sample_x_unit
@@ -573,29 +672,37 @@ class LineChartApp:
         self.default_export_ratio = self.sample_export_ratio
 
         self.apply_sample_data(self.sample_series)
+        self.branding_bind = root.bind("<Map>", self.on_first_map, add="+")
+
+    def on_first_map(self, event):
+        if event.widget is not self.root or not self.branding_bind:
+            return
+        self.root.unbind("<Map>", self.branding_bind)
+        self.branding_bind = None
+        self.root.after_idle(self.load_branding)
+        if os.environ.get(STARTUP_CHECK_ENV):
+            self.root.after_idle(self.root.destroy)
 
     def load_branding(self):
-        image_path = resource_path("messageImage_1767257219427.jpg")
-        if not Image or not ImageTk or not os.path.exists(image_path):
+        if not Image or not ImageTk:
             return
-        try:
-            image = Image.open(image_path)
-            image = image.convert("RGBA")
-        except OSError:
+        images = {}
+        for name, size in BRANDING_SIZES.items():
+            try:
+                images[name] = branding_image(name, size)
+            except OSError:
+                return
+        if images["icon"] is None:
             return
 
-        resample = getattr(Image, "Resampling", Image).LANCZOS
-        icon_image = image.copy()
-        icon_image.thumbnail((256, 256), resample)
-        self.app_icon = ImageTk.PhotoImage(icon_image)
+        self.app_icon = ImageTk.PhotoImage(images["icon"])
         try:
             self.root.iconphoto(True, self.app_icon)
         except tk.TclError:
             pass
-
-        banner_image = image.copy()
-        banner_image.thumbnail((96, 96), resample)
-        self.banner_image = ImageTk.PhotoImage(banner_image)
+        self.banner_image = ImageTk.PhotoImage(images["banner"])
+        self.banner_label.configure(image=self.banner_image)
+        self.banner_label.grid(row=0, column=0, padx=(0, 10))
 
     def add_series(self):
         index = len(self.series_rows) + 1
@@ -611,6 +718,7 @@ class LineChartApp:
         if not series_defs:
             self.add_series()
             return
+        grid_pool = {}
         for series in series_defs:
             if len(series) == 3:
                 name, values, x_values = series
@@ -619,18 +727,23 @@ class LineChartApp:
                 x_values = None
             row = self.add_series()
             row.name_var.set(name)
+            if isinstance(values, StoredValues):
+                row.stored = values
+                values = values.summary()
             row.values_var.set(values)
-            row.x_values = x_values
+            row.x_values = share_x_grid(x_values, grid_pool) if x_values is not None else None
 
     def remove_series(self, row):
         if row not in self.series_rows:
             return
+        self.checkpoint()
         self.series_rows.remove(row)
         row.destroy()
         for i, series in enumerate(self.series_rows):
             series.name_var.set(f"序列 {i + 1}")
 
     def remove_unchecked(self):
+        self.checkpoint()
         kept = []
         for row in self.series_rows:
             if row.enabled_var.get():
@@ -642,6 +755,7 @@ class LineChartApp:
             self.add_series()
 
     def clear(self):
+        self.checkpoint()
         self.x_items_var.set("")
         self.x_unit_var.set("")
         self.y_unit_var.set("")
@@ -652,16 +766,13 @@ class LineChartApp:
         self.allow_negative_var.set(True)
         self.notes_text.delete("1.0", tk.END)
         self.excel_text.delete("1.0", tk.END)
+        self.excel_summary_var.set("")
         for row in self.series_rows:
             row.values_var.set("")
-        self.ax.clear()
-        chart_bg = self.chart_bg_var.get().strip() or "#1a1333"
-        self.figure.set_facecolor(chart_bg)
-        self.ax.set_facecolor(chart_bg)
-        self.canvas.get_tk_widget().configure(background=chart_bg)
-        self.canvas.draw()
+        self.clear_axes(self.chart_bg_var.get().strip() or "#1a1333")
 
     def reset(self):
+        self.checkpoint()
         self.x_items_var.set(self.default_x_items)
         self.x_unit_var.set(self.default_x_unit)
         self.x_unit_enabled_var.set(True)
@@ -676,17 +787,36 @@ class LineChartApp:
         self.notes_text.delete("1.0", tk.END)
         self.notes_text.insert("1.0", self.default_notes)
         self.excel_text.delete("1.0", tk.END)
+        self.excel_summary_var.set("")
         if self.sample_excel_text:
             self.excel_text.insert("1.0", self.sample_excel_text)
         self.set_series_rows(self.sample_series)
         self.line_color_var.set(self.default_line_color)
         self.auto_color_var.set(True)
         self.chart_bg_var.set(self.default_chart_bg)
-        self.ax.clear()
-        self.figure.set_facecolor(self.default_chart_bg)
-        self.ax.set_facecolor(self.default_chart_bg)
-        self.canvas.get_tk_widget().configure(background=self.default_chart_bg)
+        self.clear_axes(self.default_chart_bg)
+
+    def clear_axes(self, chart_bg):
+        self.stop_stream()
+        theme = compile_theme(THEME_LABELS.get(self.theme_var.get(), DEFAULT_THEME), chart_bg or None)
+        chart_bg = theme["chart_bg"]
+        self.stale_panels = {}
+        for ax in self.axes:
+            clear_data(ax)
+            style_axes(ax, theme)
+        self.panel_drawn = [None] * len(self.axes)
+        self.figure.set_facecolor(chart_bg)
+        self.canvas.get_tk_widget().configure(background=chart_bg)
         self.canvas.draw()
+        self.overview_lines = []
+        self.draw_overview(None, chart_bg, theme["contrast"])
+
+    def sync_panels(self):
+        stale, self.stale_panels = self.stale_panels, {}
+        for ax, panel, style, xlim, ylim in stale.values():
+            draw_panel(ax, panel, style, xlim=xlim, ylim=ylim)
+        if stale:
+            self.sync_overview()
 
     def apply_sample_data(self, series_defs):
         self.x_items_var.set(self.sample_x_items)
@@ -703,6 +833,7 @@ class LineChartApp:
         self.notes_text.delete("1.0", tk.END)
         self.notes_text.insert("1.0", self.sample_notes)
         self.excel_text.delete("1.0", tk.END)
+        self.excel_summary_var.set("")
         if self.sample_excel_text:
             self.excel_text.insert("1.0", self.sample_excel_text)
         self.line_color_var.set(self.sample_line_color)
@@ -711,14 +842,50 @@ class LineChartApp:
         self.set_series_rows(series_defs)
 
     def load_sample(self):
+        self.checkpoint()
         self.apply_sample_data(self.sample_series)
 
     def apply_excel(self):
+        self.excel_summary_var.set("")
+        self.apply_excel_text(self.excel_text.get("1.0", tk.END))
+
+    def apply_clipboard(self):
         try:
-            x_items, x_values, x_unit, series_defs = parse_excel_block(self.excel_text.get("1.0", tk.END))
-        except ValueError as exc:
-            messagebox.showerror("輸入錯誤", str(exc))
+            text = self.root.clipboard_get()
+        except tk.TclError:
+            messagebox.showerror("輸入錯誤", "剪貼簿沒有可用的文字內容")
+            return
+        series_defs = self.apply_excel_text(text)
+        if series_defs is None:
             return
+        self.excel_text.delete("1.0", tk.END)
+        rows = text.strip("\r\n").count("\n") + 1
+        columns = text.split("\n", 1)[0].count("\t") + 1
+        self.excel_summary_var.set(f"已套用剪貼簿：{rows} 列 × {columns} 欄，偵測到 {len(series_defs)} 個序列")
+
+    def apply_excel_text(self, text):
+        paired = parse_paired_columns(text) if len(text) * TEXT_COPY_FACTOR > self.memory.budget else None
+        if paired is not None:
+            x_unit, series_defs = paired
+            x_items = []
+            x_values = []
+        else:
+            paste_key = ("paste", hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest())
+            parsed = self.render_cache.get(paste_key)
+            if parsed is None:
+                try:
+                    parsed = parse_excel_block(text)
+                except ValueError as exc:
+                    messagebox.showerror("輸入錯誤", str(exc))
+                    return None
+                self.render_cache.put(paste_key, parsed, parsed_block_nbytes(parsed))
+            x_items, x_values, x_unit, series_defs = parsed
+        self.checkpoint()
+        degraded = []
+        if paired is not None:
+            series_defs = [(name, self.store_values(values), x_grid) for name, values, x_grid in series_defs]
+            self.excel_text.delete("1.0", tk.END)
+            degraded.append("貼上內容改以暫存檔（memmap）匯入，序列欄位僅顯示摘要，X 軸改用各序列的 X 數值")
         self.x_items_var.set(",".join(x_items))
         if x_values:
             self.x_values_var.set(",".join(x_values))
@@ -730,33 +897,167 @@ class LineChartApp:
         if len(series_defs) > 1:
             self.auto_color_var.set(True)
         self.set_series_rows(series_defs)
+        if degraded:
+            self.memory.track("輸入文字", len(text) * TEXT_COPY_FACTOR)
+            self.notify_degraded(degraded)
+        return series_defs
+
+    def store_values(self, values):
+        if self.storage_dir is None:
+            self.storage_dir = tempfile.mkdtemp(prefix="linechart-")
+            atexit.register(shutil.rmtree, self.storage_dir, True)
+        return StoredValues(values, self.storage_dir)
+
+    def store_large_series(self, rows):
+        self.memory.stages = {}
+        self.memory.series = {}
+        text_size = len(self.widget_text("excel_text")) + len(self.x_items_var.get()) + len(self.x_values_var.get())
+        self.memory.track("輸入文字", text_size * TEXT_COPY_FACTOR)
+        for row in rows:
+            self.memory.track_series(row.name_var.get() or "序列", series_nbytes(row.values()))
+        self.memory.track("序列數值", sum(self.memory.series.values()))
+        if not self.memory.over_budget():
+            return []
+        moved = 0
+        for row in sorted(rows, key=lambda item: series_nbytes(item.values()), reverse=True):
+            values = row.values()
+            if isinstance(values, StoredValues):
+                continue
+            array, bad_rows = parse_series_values(values)
+            if len(bad_rows) or not len(array):
+                continue
+            row.stored = self.store_values(array)
+            row.values_var.set(row.stored.summary())
+            self.memory.track_series(row.name_var.get() or "序列", 0)
+            self.memory.track("序列數值", sum(self.memory.series.values()))
+            moved += 1
+            if not self.memory.over_budget():
+                break
+        if not moved:
+            return []
+        clear_caches()
+        return [f"{moved} 條序列改存於暫存檔（memmap），欄位僅顯示摘要"]
+
+    def notify_degraded(self, actions):
+        lines = [f"資料超過記憶體預算（{self.memory.summary()}），已自動調整："]
+        lines += [f"・{action}" for action in actions]
+        details = self.memory.details()
+        if details:
+            lines += ["", "估計用量："] + details
+        messagebox.showinfo("大型資料", "\n".join(lines))
+
+    def capture_state(self):
+        previous = self.history.latest
+        fields = tuple(getattr(self, name).get() for name in CHART_STATE_FIELDS)
+        texts = tuple(self.widget_text(name) for name in CHART_STATE_TEXTS)
+        previous_rows = previous.series if previous else ()
+        series = []
+        for idx, row in enumerate(self.series_rows):
+            values = tuple(
+                row.values_text() if name == "values_var" else getattr(row, name).get() for name in SERIES_STATE_FIELDS
+            ) + (row.x_values, row.stored)
+            series.append(share_state(values, previous_rows[idx] if idx < len(previous_rows) else None))
+        drawn = any(key is not None for key in self.panel_drawn)
+        if previous:
+            fields = share_state(fields, previous.fields)
+            texts = share_state(texts, previous.texts)
+        return ChartState(fields, texts, tuple(series), drawn)
+
+    def widget_text(self, name):
+        widget = getattr(self, name)
+        if name not in self.text_snapshots or widget.edit_modified():
+            self.text_snapshots[name] = widget.get("1.0", "end-1c")
+            widget.edit_modified(False)
+        return self.text_snapshots[name]
+
+    def checkpoint(self):
+        if not self.restoring_state:
+            self.history.record(self.capture_state())
+
+    def restore_state(self, state):
+        current = self.capture_state()
+        for name, old, new in zip(CHART_STATE_FIELDS, current.fields, state.fields):
+            if old is not new and old != new:
+                getattr(self, name).set(new)
+        for name, old, new in zip(CHART_STATE_TEXTS, current.texts, state.texts):
+            if old is not new and old != new:
+                widget = getattr(self, name)
+                widget.delete("1.0", tk.END)
+                widget.insert("1.0", new)
+        while len(self.series_rows) > len(state.series):
+            self.series_rows.pop().destroy()
+        while len(self.series_rows) < len(state.series):
+            self.add_series()
+        for idx, (row, values) in enumerate(zip(self.series_rows, state.series)):
+            old_values = current.series[idx] if idx < len(current.series) else (None,) * (len(SERIES_STATE_FIELDS) + 2)
+            if old_values is values:
+                continue
+            for name, old, new in zip(SERIES_STATE_FIELDS, old_values, values):
+                if old is not new and old != new:
+                    getattr(row, name).set(new)
+            row.x_values, row.stored = values[-2:]
+        self.restoring_state = True
+        try:
+            if state.drawn:
+                self.plot()
+            elif current.drawn:
+                self.clear_axes(self.chart_bg_var.get().strip() or "#1a1333")
+        finally:
+            self.restoring_state = False
+
+    def show_validation_report(self, report):
+        window = getattr(self, "report_window", None)
+        if not report:
+            if window is not None:
+                window.destroy()
+                self.report_window = None
+            return
+        if window is None or not window.winfo_exists():
+            window = tk.Toplevel(self.root)
+            window.title("資料檢查")
+            window.columnconfigure(0, weight=1)
+            window.rowconfigure(1, weight=1)
+            window.protocol("WM_DELETE_WINDOW", lambda: self.show_validation_report([]))
+            self.report_summary_var = tk.StringVar()
+            ttk.Label(window, textvariable=self.report_summary_var, padding=(8, 8, 8, 4)).grid(row=0, column=0, columnspan=2, sticky="w")
+            tree = ttk.Treeview(window, columns=("series", "row", "problem"), show="headings", height=12)
+            tree.heading("series", text="序列")
+            tree.heading("row", text="第幾筆")
+            tree.heading("problem", text="問題")
+            tree.column("series", width=140, anchor="w")
+            tree.column("row", width=70, anchor="e")
+            tree.column("problem", width=360, anchor="w")
+            tree.grid(row=1, column=0, sticky="nsew", padx=(8, 0), pady=(0, 8))
+            scrollbar = ttk.Scrollbar(window, orient="vertical", command=tree.yview)
+            scrollbar.grid(row=1, column=1, sticky="ns", padx=(0, 8), pady=(0, 8))
+            tree.configure(yscrollcommand=scrollbar.set)
+            self.report_tree = tree
+            self.report_window = window
+        series_count = len({series for series, _row, _problem in report})
+        self.report_summary_var.set(f"共 {len(report)} 個問題，涉及 {series_count} 個序列；修正後再按「繪製」")
+        self.report_tree.delete(*self.report_tree.get_children())
+        for series, row, problem in report:
+            self.report_tree.insert("", tk.END, values=(series, "" if row is None else row, problem))
+        window.lift()
+
+    def undo(self):
+        state = self.history.undo(self.capture_state())
+        if state is not None:
+            self.restore_state(state)
+
+    def redo(self):
+        state = self.history.redo(self.capture_state())
+        if state is not None:
+            self.restore_state(state)
 
     def normalize_color(self, value, label):
         value = value.strip()
         if not value:
             return ""
         try:
-            self.root.winfo_rgb(value)
-        except tk.TclError as exc:
+            return normalize_color(value)
+        except ValueError as exc:
             raise ValueError(f"{label} 格式不正確") from exc
-        return value
-
-    def color_to_rgb(self, value):
-        r, g, b = self.root.winfo_rgb(value)
-        return r / 65535.0, g / 65535.0, b / 65535.0
-
-    def contrast_color(self, value):
-        r, g, b = self.color_to_rgb(value)
-        luminance = 0.2126 * r + 0.7152 * g + 0.0722 * b
-        return "#f5f5f5" if luminance < 0.5 else "#111111"
-
-    def blend_color(self, fg, bg, alpha):
-        fr, fg_c, fb = self.color_to_rgb(fg)
-        br, bg_c, bb = self.color_to_rgb(bg)
-        r = fr * alpha + br * (1 - alpha)
-        g = fg_c * alpha + bg_c * (1 - alpha)
-        b = fb * alpha + bb * (1 - alpha)
-        return f"#{int(r * 255):02x}{int(g * 255):02x}{int(b * 255):02x}"
 
     def pick_line_color(self):
         color = colorchooser.askcolor(title="選擇折線顏色")[1]
@@ -772,10 +1073,13 @@ class LineChartApp:
         file_path = filedialog.asksaveasfilename(
             title="儲存圖表圖片",
             defaultextension=".png",
-            filetypes=[("PNG image", "*.png"), ("JPEG image", "*.jpg;*.jpeg"), ("All files", "*.*")],
+            filetypes=[("PNG image", "*.png"), ("JPEG image", "*.jpg;*.jpeg")],
         )
         if not file_path:
             return
+        if os.path.splitext(file_path)[1].lower() not in IMAGE_EXTENSIONS:
+            file_path += ".png"
+        self.sync_panels()
         original_size = self.figure.get_size_inches()
         ratio = self.export_ratio_var.get()
         if ratio == "A4 直式":
@@ -783,10 +1087,295 @@ class LineChartApp:
         else:
             target_size = (11.69, 8.27)
         self.figure.set_size_inches(*target_size)
-        self.figure.savefig(file_path, dpi=100, bbox_inches="tight")
-        self.figure.set_size_inches(*original_size)
+        try:
+            self.figure.savefig(file_path, dpi=100, bbox_inches="tight")
+        except (ValueError, OSError) as exc:
+            messagebox.showerror("儲存錯誤", f"無法儲存圖片：{exc}")
+            return
+        finally:
+            self.figure.set_size_inches(*original_size)
         messagebox.showinfo("完成", f"圖片已儲存：{file_path}")
 
+    def apply_theme(self):
+        self.sync_panels()
+        name = THEME_LABELS.get(self.theme_var.get(), DEFAULT_THEME)
+        theme = compile_theme(name)
+        self.chart_bg_var.set(theme["chart_bg"])
+        for ax in self.axes:
+            style_axes(ax, theme)
+        self.figure.set_facecolor(theme["chart_bg"])
+        self.canvas.get_tk_widget().configure(background=theme["chart_bg"])
+        old_contrast = self.overview_style[1]
+        self.overview_lines = [
+            (x_values, y_values, theme["contrast"] if same_color(color, old_contrast) else color)
+            for x_values, y_values, color in self.overview_lines
+        ]
+        self.overview_style = (theme["chart_bg"], theme["contrast"])
+        self.draw_overview(self.overview_key, force=True)
+        self.canvas.draw_idle()
+
+    def draw_overview(self, key, chart_bg=None, contrast=None, force=False):
+        if key == self.overview_key and not force:
+            self.sync_overview()
+            return
+        ax = self.overview_ax
+        if not force:
+            self.overview_key = key
+            self.overview_lines = []
+            self.overview_bounds = None
+            bounds = []
+            for cached in self.panel_cache if key is not None else []:
+                panel = cached[1]
+                for series_x, y_values, _name, color, _marker in panel["lines"]:
+                    series_x = np.asarray(series_x, dtype=float)
+                    self.overview_lines.append(minmax_decimate(series_x, y_values, OVERVIEW_BUCKETS) + (color,))
+                if panel["xlim"]:
+                    bounds.append((panel["xlim"], panel["invert_x"]))
+            if bounds:
+                low = min(xlim[0] for xlim, _invert in bounds)
+                high = max(xlim[1] for xlim, _invert in bounds)
+                self.overview_bounds = (high, low) if bounds[0][1] else (low, high)
+            self.overview_style = (chart_bg or "#1a1333", contrast or "#ffffff")
+        chart_bg, contrast = self.overview_style
+        ax.clear()
+        ax.set_facecolor(chart_bg)
+        ax.set_xticks([])
+        ax.set_yticks([])
+        for spine in ax.spines.values():
+            spine.set_color(blend_color(contrast, chart_bg, 0.35))
+        for x_values, y_values, color in self.overview_lines:
+            ax.plot(x_values, y_values, color=color, linewidth=0.8)
+        if self.overview_bounds:
+            ax.set_xlim(*self.overview_bounds)
+        self.overview_window = Rectangle(
+            (0, 0), 0, 1, transform=ax.get_xaxis_transform(), animated=True,
+            facecolor=contrast, edgecolor=contrast, alpha=0.25,
+        )
+        ax.add_patch(self.overview_window)
+        self.overview_figure.patch.set_facecolor(chart_bg)
+        self.overview_canvas.get_tk_widget().configure(background=chart_bg)
+        self.overview_canvas.draw()
+        self.overview_background = self.overview_canvas.copy_from_bbox(ax.bbox)
+        self.sync_overview()
+
+    def sync_overview(self):
+        if not self.overview_lines or self.stale_panels or not self.axes[0].has_data():
+            return
+        self.blit_overview(*self.axes[0].get_xlim())
+
+    def blit_overview(self, low, high):
+        low, high = min(low, high), max(low, high)
+        self.overview_window.set_x(low)
+        self.overview_window.set_width(high - low)
+        self.overview_canvas.restore_region(self.overview_background)
+        self.overview_ax.draw_artist(self.overview_window)
+        self.overview_canvas.blit(self.overview_ax.bbox)
+
+    def set_view_range(self, low, high):
+        self.sync_panels()
+        if self.overview_bounds:
+            full_low, full_high = sorted(self.overview_bounds)
+            span = min(high - low, full_high - full_low)
+            low = min(max(low, full_low), full_high - span)
+            high = low + span
+        self.blit_overview(low, high)
+        for ax in self.axes:
+            if ax.has_data():
+                ax.set_xlim((high, low) if ax.xaxis_inverted() else (low, high))
+        self.panel_drawn = [None] * len(self.axes)
+        self.canvas.draw_idle()
+
+    def on_canvas_resize(self, _event):
+        for ax in self.axes:
+            if ax.has_data():
+                refresh_lod(ax)
+
+    def on_overview_press(self, event):
+        if event.inaxes is not self.overview_ax or not self.overview_lines or event.xdata is None:
+            return
+        if event.dblclick and self.overview_bounds:
+            self.overview_drag = None
+            self.set_view_range(*sorted(self.overview_bounds))
+            return
+        low, high = sorted(self.axes[0].get_xlim())
+        if not low <= event.xdata <= high:
+            half = (high - low) / 2
+            low, high = event.xdata - half, event.xdata + half
+            self.set_view_range(low, high)
+        self.overview_drag = (event.xdata, low, high)
+
+    def on_overview_drag(self, event):
+        if self.overview_drag is None or event.xdata is None:
+            return
+        anchor, low, high = self.overview_drag
+        shift = event.xdata - anchor
+        self.set_view_range(low + shift, high + shift)
+
+    def on_overview_release(self, _event):
+        self.overview_drag = None
+
+    def export_series(self):
+        x_items = [item.strip() for item in self.x_items_var.get().split(",") if item.strip()]
+        x_values = [item.strip() for item in self.x_values_var.get().split(",") if item.strip()]
+        if x_values and len(x_values) == len(x_items):
+            common_x = np.array(x_values, dtype=float)
+        else:
+            try:
+                common_x = np.array(x_items, dtype=float)
+            except ValueError:
+                common_x = np.array(x_items)
+        series = []
+        for row in self.series_rows:
+            if not row.enabled_var.get():
+                continue
+            name = row.name_var.get()
+            y_values = series_values(row.values(), name or "序列")
+            processing = row.processing()
+            if self.processed_view_var.get() and processing:
+                y_values = process_series(y_values, row.x_values, processing)
+            series.append((name, row.x_values or common_x, y_values))
+        if not series:
+            raise ValueError("尚未勾選任何序列")
+        derived = self.derived_settings()
+        if derived and len(series) > 1:
+            shared_grid = XGrid(common_x) if common_x.dtype.kind == "f" and len(common_x) else None
+            items = [
+                (name or "序列", x_values if isinstance(x_values, XGrid) else shared_grid, y_values)
+                for name, x_values, y_values in series
+            ]
+            name, y_values = derive_series(derived[0], items, derived[1])
+            series.append((name, series[0][1], y_values))
+        return series
+
+    def derived_settings(self):
+        if self.derived_var.get() not in DERIVED_KINDS[1:]:
+            return None
+        return self.derived_var.get(), self.resample_var.get()
+
+    def export_data(self):
+        try:
+            series = self.export_series()
+        except ValueError as exc:
+            messagebox.showerror("輸入錯誤", str(exc))
+            return
+        file_path = filedialog.asksaveasfilename(
+            title="匯出圖表資料",
+            defaultextension=".csv",
+            filetypes=export_filetypes() + [("All files", "*.*")],
+        )
+        if not file_path:
+            return
+        try:
+            write_series(file_path, series)
+        except (OSError, ValueError) as exc:
+            messagebox.showerror("匯出失敗", str(exc))
+            return
+        messagebox.showinfo("完成", f"資料已匯出：{file_path}")
+
+    def append_points(self, name, x_values, y_values):
+        with self.stream_lock:
+            stream = self.streams.get(name)
+            if stream is None:
+                stream = self.streams[name] = StreamSeries(name)
+        stream.append(x_values, y_values)
+        self.stream_dirty = True
+
+    def start_stream(self):
+        self.stop_stream()
+        self.sync_panels()
+        with self.stream_lock:
+            self.streams = {}
+        self.stream_lines = {}
+        theme = compile_theme(THEME_LABELS.get(self.theme_var.get(), DEFAULT_THEME), self.chart_bg_var.get().strip() or None)
+        clear_data(self.ax)
+        style_axes(self.ax, theme)
+        self.panel_drawn[0] = None
+        self.stream_tick_job = self.root.after(STREAM_DRAW_INTERVAL_MS, self._stream_tick)
+
+    def stop_stream(self):
+        if self.stream_tick_job:
+            self.stream_status_var.set("已停止監看")
+        for job in (self.stream_tick_job, self.stream_poll_job):
+            if job:
+                self.root.after_cancel(job)
+        self.stream_tick_job = None
+        self.stream_poll_job = None
+        self.stream_source = None
+
+    def start_file_stream(self):
+        file_path = filedialog.askopenfilename(
+            title="選擇要監看的資料檔",
+            filetypes=[("Text data", "*.tsv;*.txt;*.csv"), ("All files", "*.*")],
+        )
+        if not file_path:
+            return
+        self.start_stream()
+        self.stream_source = FileTailSource(file_path)
+        self.stream_status_var.set(f"監看中：{os.path.basename(file_path)}")
+        self._poll_stream_source()
+
+    def _poll_stream_source(self):
+        source = self.stream_source
+        try:
+            rows = source.read()
+        except OSError as exc:
+            self.stop_stream()
+            messagebox.showerror("讀取錯誤", f"無法讀取監看檔案：{exc}")
+            return
+        if rows is not None:
+            for column, name in enumerate(source.names, start=1):
+                if column < rows.shape[1]:
+                    self.append_points(name, rows[:, 0], rows[:, column])
+        self.stream_poll_job = self.root.after(STREAM_POLL_INTERVAL_MS, self._poll_stream_source)
+
+    def _stream_tick(self):
+        if self.stream_dirty:
+            self.stream_dirty = False
+            self.draw_streams()
+        self.stream_tick_job = self.root.after(STREAM_DRAW_INTERVAL_MS, self._stream_tick)
+
+    def draw_streams(self):
+        try:
+            window = float(self.stream_window_var.get()) if self.stream_window_var.get().strip() else None
+        except ValueError:
+            window = None
+        with self.stream_lock:
+            streams = list(self.streams.values())
+        x_bounds = []
+        y_bounds = []
+        new_line = False
+        buckets = max(int(self.ax.bbox.width), 1)
+        for idx, stream in enumerate(streams):
+            x_values, y_values = stream.snapshot(window)
+            if not len(x_values):
+                continue
+            x_values, y_values = minmax_decimate(x_values, y_values, buckets)
+            line = self.stream_lines.get(stream.name)
+            if line is None or line.axes is not self.ax:
+                (line,) = self.ax.plot([], [], color=SERIES_PALETTE[idx % len(SERIES_PALETTE)], label=stream.name)
+                self.stream_lines[stream.name] = line
+                new_line = True
+            line.set_data(x_values, y_values)
+            x_bounds.append((x_values[0], x_values[-1]))
+            if np.isfinite(y_values).any():
+                y_bounds.append((np.nanmin(y_values), np.nanmax(y_values)))
+        if not x_bounds:
+            return
+        x_low = min(low for low, _ in x_bounds)
+        x_high = max(high for _, high in x_bounds)
+        if window:
+            x_low = x_high - window
+        self.ax.set_xlim(x_low, x_high if x_high > x_low else x_low + 1)
+        if y_bounds:
+            y_low = min(low for low, _ in y_bounds)
+            y_high = max(high for _, high in y_bounds)
+            margin = (y_high - y_low) * 0.05 or 0.5
+            self.ax.set_ylim(y_low - margin, y_high + margin)
+        if new_line:
+            self.ax.legend()
+        self.panel_drawn[0] = None
+        self.canvas.draw_idle()
+
     def plot(self):
         x_items = []
         if self.x_items_var.get().strip():
@@ -809,34 +1398,6 @@ class LineChartApp:
             messagebox.showerror("輸入錯誤", "尚未勾選任何序列")
             return
 
-        y_values_list = []
-        series_names = []
-        for row in enabled_rows:
-            try:
-                y_values = parse_csv_numbers(row.values_var.get(), row.name_var.get() or "序列")
-            except ValueError as exc:
-                messagebox.showerror("輸入錯誤", str(exc))
-                return
-            if row.x_values:
-                if len(y_values) != len(row.x_values):
-                    messagebox.showerror("輸入錯誤", f"{row.name_var.get()} 數值數量需與 X 數值相同")
-                    return
-            else:
-                if not x_items:
-                    messagebox.showerror("輸入錯誤", "請輸入 X 軸項目或使用 Excel 貼上")
-                    return
-                if len(y_values) != len(x_items):
-                    messagebox.showerror("輸入錯誤", f"{row.name_var.get()} 數值數量需與 X 軸項目相同")
-                    return
-            y_values_list.append(y_values)
-            series_names.append(row.name_var.get())
-
-        if not self.allow_negative_var.get():
-            for y_values in y_values_list:
-                if any(value < 0 for value in y_values):
-                    messagebox.showerror("輸入錯誤", "已勾選不允許負值")
-                    return
-
         try:
             interval = float(self.interval_var.get()) if self.interval_var.get().strip() else None
         except ValueError:
@@ -856,157 +1417,182 @@ class LineChartApp:
             messagebox.showerror("輸入錯誤", str(exc))
             return
 
-        all_values = [value for series in y_values_list for value in series]
-        data_min = min(all_values)
-        data_max = max(all_values)
-        if ymin is None:
-            ymin = data_min
-        if ymax is None:
-            ymax = data_max
-        if not self.allow_negative_var.get():
-            ymin = max(0, ymin)
-
         try:
             line_color = self.normalize_color(self.line_color_var.get(), "折線顏色")
-            chart_bg = self.normalize_color(self.chart_bg_var.get(), "圖表背景") or "#0f1217"
+            chart_bg = self.normalize_color(self.chart_bg_var.get(), "圖表背景")
         except ValueError as exc:
             messagebox.showerror("輸入錯誤", str(exc))
             return
 
-        if not x_items and enabled_rows and enabled_rows[0].x_values:
-            x_items = [str(value) for value in enabled_rows[0].x_values]
-
-        x_positions = list(range(len(x_items)))
-        xtick_positions = x_positions
-        xtick_labels = x_items
-
-        use_numeric_x = False
-        numeric_x_values = []
-        if x_values and x_items and len(x_values) == len(x_items):
-            use_numeric_x = True
-            numeric_x_values = x_values
-        else:
-            if x_items:
-                try:
-                    numeric_x_values = [float(value) for value in x_items]
-                    use_numeric_x = True
-                except ValueError:
-                    use_numeric_x = False
-
-        self.ax.clear()
-        self.figure.set_facecolor(chart_bg)
-        self.ax.set_facecolor(chart_bg)
-        self.canvas.get_tk_widget().configure(background=chart_bg)
-        contrast = self.contrast_color(chart_bg)
-        grid_color = self.blend_color(contrast, chart_bg, 0.35)
-
-        band_spans = []
-        if notes:
-            band_colors = [
-                "#1f77b4",
-                "#ff7f0e",
-                "#2ca02c",
-                "#d62728",
-                "#9467bd",
-                "#8c564b",
-            ]
-
-            def resolve_x_boundary(value):
-                value = value.strip()
-                if not value:
-                    raise ValueError("區間起點/終點不可為空")
-                try:
-                    numeric = float(value)
-                except ValueError:
-                    if value in x_items:
-                        return x_positions[x_items.index(value)]
-                    raise ValueError(f"找不到對應的 X 軸項目：{value}")
-                if x_values and len(x_values) == len(x_items):
-                    return numeric
-                if 0 <= numeric <= len(x_positions) - 1:
-                    return numeric
-                if 1 <= numeric <= len(x_positions):
-                    return numeric - 1
-                return numeric
-
+        peak_settings = None
+        if self.peaks_enabled_var.get():
             try:
-                for idx, (start_raw, end_raw, label) in enumerate(notes):
-                    start = resolve_x_boundary(start_raw)
-                    end = resolve_x_boundary(end_raw)
-                    if start > end:
-                        start, end = end, start
-                    color = band_colors[idx % len(band_colors)]
-                    band_spans.append((start, end))
-                    self.ax.axvspan(start, end, facecolor=color, alpha=0.18, label=f"{label}（{start:g}~{end:g}）")
-            except ValueError as exc:
-                messagebox.showerror("輸入錯誤", str(exc))
+                prominence = float(self.peak_prominence_var.get()) if self.peak_prominence_var.get().strip() else None
+                width = int(self.peak_width_var.get()) if self.peak_width_var.get().strip() else 0
+                max_count = int(self.peak_count_var.get()) if self.peak_count_var.get().strip() else 10
+            except ValueError:
+                messagebox.showerror("輸入錯誤", "峰值突出度需為數字，寬度與數量需為整數")
                 return
+            peak_settings = (prominence, width, max_count, self.peak_direction_var.get())
+
+        theme_name = THEME_LABELS.get(self.theme_var.get(), DEFAULT_THEME)
+        theme = compile_theme(theme_name, chart_bg or None)
+        chart_bg = theme["chart_bg"]
+        contrast = theme["contrast"]
+        settings = build_settings(
+            x_items,
+            x_values,
+            allow_negative=self.allow_negative_var.get(),
+            ymin=ymin,
+            ymax=ymax,
+            line_color=line_color,
+            contrast=contrast,
+            auto_color=self.auto_color_var.get(),
+            processed=self.processed_view_var.get(),
+            peaks=peak_settings,
+            derived=self.derived_settings(),
+        )
+        style = {
+            "theme": theme_name,
+            "chart_bg": chart_bg,
+            "x_unit": self.x_unit_var.get().strip() if self.x_unit_enabled_var.get() else "",
+            "y_unit": self.y_unit_var.get().strip() if self.y_unit_enabled_var.get() else "",
+            "interval": interval,
+        }
+        style_key = tuple(style.values())
+
+        layout_rows, layout_cols = PANEL_LAYOUTS.get(self.layout_var.get(), (1, 1))
+        panel_count = layout_rows * layout_cols
+        panel_series = [[] for _ in range(panel_count)]
+        report = []
+        checks = []
+        degraded = self.store_large_series(enabled_rows)
+        for row in enabled_rows:
+            name = row.name_var.get()
+            values = row.values()
+            try:
+                processing = row.processing()
+            except ValueError as exc:
+                report.append((name or "序列", None, str(exc)))
+                processing = None
+            panel_series[row.panel_index(panel_count)].append((name, values, row.x_values, processing))
+            checks.append((name, values, row.x_values))
+        report.extend(validate_series(checks, settings["x_items"], settings["allow_negative"], self.plot_executor))
+        self.show_validation_report(report)
+        if report:
+            if degraded:
+                self.notify_degraded(degraded)
+            return
+        panel_notes = [[] for _ in range(panel_count)]
+        for start, end, label, panel in notes:
+            for idx in range(panel_count) if panel is None else [min(panel, panel_count - 1)]:
+                panel_notes[idx].append((start, end, label))
+
+        multi_panel = panel_count > 1
+        layout = (layout_rows, layout_cols, multi_panel and self.share_x_var.get(), multi_panel and self.share_y_var.get())
+        if layout != self.panel_layout:
+            self.figure.clear()
+            self.figure.set_layout_engine("constrained" if multi_panel else None)
+            with theme_context(theme):
+                axes = self.figure.subplots(layout_rows, layout_cols, sharex=layout[2], sharey=layout[3], squeeze=False)
+            self.axes = list(axes.ravel())
+            self.ax = self.axes[0]
+            self.panel_layout = layout
+            self.panel_cache = [None] * panel_count
+            self.panel_drawn = [None] * panel_count
+            self.stale_panels = {}
+
+        changed = {}
+        panel_keys = []
+        for idx in range(panel_count):
+            key = cache_key((settings, panel_series[idx], panel_notes[idx]))
+            panel_keys.append(key)
+            cached = self.panel_cache[idx]
+            if cached is None or cached[0] != key:
+                remembered = self.render_cache.get(("panel", key))
+                if remembered is not None:
+                    self.panel_cache[idx] = (key, remembered)
+                else:
+                    changed[idx] = key
 
-        series_x_all = []
-        palette = ["#60a5fa", "#f59e0b", "#34d399", "#f472b6", "#a78bfa", "#f97316"]
-        use_auto_color = self.auto_color_var.get()
-        default_single_color = "#e11d48"
-        for idx, (row, y_values, name) in enumerate(zip(enabled_rows, y_values_list, series_names)):
-            if row.x_values:
-                series_x = [float(value) for value in row.x_values]
-                use_numeric_x = True
-            elif use_numeric_x and numeric_x_values:
-                series_x = numeric_x_values
+        try:
+            if len(changed) > 1:
+                futures = {
+                    idx: self.plot_executor.submit(prepare_panel, settings, panel_series[idx], panel_notes[idx])
+                    for idx in changed
+                }
+                for idx in sorted(futures):
+                    self.panel_cache[idx] = (changed[idx], futures[idx].result())
             else:
-                series_x = x_positions
-            series_x_all.extend(series_x)
-            marker = "o" if len(y_values) <= 60 else None
-            if use_auto_color and len(y_values_list) > 1:
-                color = palette[idx % len(palette)]
-            elif len(y_values_list) == 1 and not line_color:
-                color = default_single_color
+                for idx in changed:
+                    self.panel_cache[idx] = (changed[idx], prepare_panel(settings, panel_series[idx], panel_notes[idx]))
+        except ValueError as exc:
+            messagebox.showerror("輸入錯誤", str(exc))
+            if degraded:
+                self.notify_degraded(degraded)
+            return
+        self.memory.track("圖表資料", sum(panel_nbytes(cached[1]) for cached in self.panel_cache))
+        if self.memory.over_budget():
+            decimated = False
+            for idx, (key, panel) in enumerate(self.panel_cache):
+                if any(len(line[1]) > DEGRADED_POINTS * 2 for line in panel["lines"]):
+                    self.panel_cache[idx] = (key, decimate_panel(panel))
+                    self.panel_drawn[idx] = None
+                    changed[idx] = key
+                    decimated = True
+            if decimated:
+                self.memory.track("圖表資料", sum(panel_nbytes(cached[1]) for cached in self.panel_cache))
+                degraded.append(f"圖表改用抽樣預覽（每條最多約 {DEGRADED_POINTS * 2:,} 點），放大時細節較少")
+        for idx, key in changed.items():
+            panel = self.panel_cache[idx][1]
+            self.render_cache.put(("panel", key), panel, panel_nbytes(panel))
+
+        self.stop_stream()
+        prepared = [cached[1] for cached in self.panel_cache]
+        shared_xlim = None
+        shared_ylim = None
+        if layout[2]:
+            limits = [panel["xlim"] for panel in prepared if panel["xlim"]]
+            if limits:
+                shared_xlim = (min(low for low, _ in limits), max(high for _, high in limits))
+                if any(panel["invert_x"] for panel in prepared):
+                    shared_xlim = shared_xlim[::-1]
+        if layout[3]:
+            limits = [panel["ylim"] for panel in prepared if panel["ylim"]]
+            if limits:
+                shared_ylim = (min(low for low, _ in limits), max(high for _, high in limits))
+
+        preview_key = ("preview", cache_key((layout, panel_keys, style_key, tuple(self.figure.bbox.size))))
+        preview = self.render_cache.get(preview_key)
+        if preview is None:
+            self.sync_panels()
+        for idx, ax in enumerate(self.axes):
+            draw_key = (self.panel_cache[idx][0], style_key, shared_xlim, shared_ylim)
+            if self.panel_drawn[idx] == draw_key:
+                continue
+            self.panel_drawn[idx] = draw_key
+            if preview is not None:
+                self.stale_panels[idx] = (ax, prepared[idx], style, shared_xlim, shared_ylim)
             else:
-                color = line_color if line_color else contrast
-            self.ax.plot(series_x, y_values, marker=marker, label=name, color=color)
-
-        if series_x_all:
-            self.ax.set_xlim(min(series_x_all), max(series_x_all))
-            if len(series_x_all) >= 2 and series_x_all[0] > series_x_all[-1]:
-                self.ax.invert_xaxis()
-
-        if use_numeric_x:
-            self.ax.xaxis.set_major_locator(MaxNLocator(nbins=8))
-        else:
-            self.ax.set_xticks(xtick_positions)
-            self.ax.set_xticklabels(xtick_labels)
-            if len(xtick_labels) > 8:
-                self.ax.tick_params(axis="x", labelrotation=45)
-        x_unit = self.x_unit_var.get().strip() if self.x_unit_enabled_var.get() else ""
-        if x_unit:
-            self.ax.set_xlabel(x_unit, color=contrast)
-        y_unit = self.y_unit_var.get().strip() if self.y_unit_enabled_var.get() else ""
-        if y_unit:
-            self.ax.set_ylabel(y_unit, color=contrast)
-
-        self.ax.set_ylim(ymin, ymax)
-        if interval:
-            ticks = []
-            current = ymin
-            while current <= ymax + 1e-9:
-                ticks.append(current)
-                current += interval
-            self.ax.set_yticks(ticks)
-
-        self.ax.grid(True, linestyle="--", alpha=0.5, color=grid_color)
-        self.ax.tick_params(colors=contrast)
-        for spine in self.ax.spines.values():
-            spine.set_color(grid_color)
-        legend = self.ax.legend()
-        if legend:
-            for text in legend.get_texts():
-                text.set_color(contrast)
-
-        if band_spans and series_x_all:
-            min_span = min(span[0] for span in band_spans)
-            max_span = max(span[1] for span in band_spans)
-            self.ax.set_xlim(min(min(series_x_all), min_span), max(max(series_x_all), max_span))
+                draw_panel(ax, prepared[idx], style, xlim=shared_xlim, ylim=shared_ylim)
 
+        self.figure.set_facecolor(chart_bg)
+        self.canvas.get_tk_widget().configure(background=chart_bg)
+        self.checkpoint()
+        self.draw_overview(tuple(panel_keys), chart_bg, contrast)
+        self.memory.track("快取", self.render_cache.nbytes)
+        self.memory_var.set(self.memory.summary())
+        if degraded:
+            self.notify_degraded(degraded)
+        if preview is not None:
+            self.canvas.restore_region(preview)
+            self.canvas.blit()
+            if self.stale_panels:
+                self.root.after_idle(self.sync_panels)
+            return
         self.canvas.draw()
+        width, height = self.figure.bbox.size
+        self.render_cache.put(preview_key, self.canvas.copy_from_bbox(self.figure.bbox), int(width * height * 4))
 
 
 if __name__ == "__main__":
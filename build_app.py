@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
+import argparse
+import json
+import os
 import platform
 import shlex
 import subprocess
 import sys
+import time
 import zipfile
 from pathlib import Path
 
@@ -11,10 +15,93 @@ try:
 except ImportError:
     Image = None
 
+from chart_branding import BRANDING_DIR, BRANDING_SIZES, BRANDING_SOURCE
+
 APP_NAME = "LineChart"
 ENTRYPOINT = "Line_chart.py"
-ICON_SOURCE = "messageImage_1767257219427.jpg"
-ASSET_DIR = "build_assets"
+ICON_SOURCE = BRANDING_SOURCE
+ASSET_DIR = BRANDING_DIR
+DATA_FILES = ["sample_data.json", "sample_excel.txt"]
+HOOKS_DIR = "hooks"
+PROFILES = ("optimized", "full")
+OPTIMIZE_LEVEL = 2
+BUILD_ENV = {"PYTHONHASHSEED": "0"}
+STARTUP_CHECK_ENV = "LINECHART_STARTUP_CHECK"
+STARTUP_RUNS = 3
+STARTUP_TIMEOUT = 120
+
+USED_MODULES = [
+    "chart_branding",
+    "chart_colors",
+    "chart_export",
+    "chart_history",
+    "chart_pipeline",
+    "chart_stream",
+    "chart_themes",
+    "matplotlib.backends.backend_agg",
+    "matplotlib.backends.backend_tkagg",
+]
+UNUSED_BACKENDS = [
+    "cairo",
+    "gtk3",
+    "gtk3agg",
+    "gtk3cairo",
+    "gtk4",
+    "gtk4agg",
+    "gtk4cairo",
+    "macosx",
+    "nbagg",
+    "pdf",
+    "pgf",
+    "ps",
+    "qt",
+    "qt5",
+    "qt5agg",
+    "qt5cairo",
+    "qtagg",
+    "qtcairo",
+    "svg",
+    "template",
+    "tkcairo",
+    "webagg",
+    "webagg_core",
+    "wx",
+    "wxagg",
+    "wxcairo",
+]
+EXCLUDED_MODULES = [f"matplotlib.backends.backend_{name}" for name in UNUSED_BACKENDS] + [
+    "IPython",
+    "PyQt5",
+    "PyQt6",
+    "PySide2",
+    "PySide6",
+    "gi",
+    "matplotlib.backends.qt_compat",
+    "matplotlib.testing",
+    "matplotlib.tests",
+    "mpl_toolkits",
+    "pandas",
+    "pytest",
+    "render_server",
+    "scipy",
+    "tornado",
+    "wx",
+]
+PRUNED_MPL_DATA = [
+    "**/sample_data",
+    "**/fonts/afm",
+    "**/fonts/pdfcorefonts",
+    "**/plot_directive",
+    "**/kpsewhich.lua",
+]
+MPL_HOOK_TEMPLATE = """from PyInstaller.compat import is_win
+from PyInstaller.utils.hooks import collect_data_files, collect_delvewheel_libs_directory
+
+datas = collect_data_files("matplotlib", subdir="mpl-data", excludes={excludes!r})
+binaries = []
+if is_win:
+    datas, binaries = collect_delvewheel_libs_directory("matplotlib", datas=datas, binaries=binaries)
+"""
 
 
 def ensure_pyinstaller():
@@ -67,8 +154,66 @@ def build_icon(root, system_name):
     return None
 
 
-def build_pyinstaller_command(root, system_name, icon_path):
-    data_sep = ";" if system_name == "Windows" else ":"
+def build_branding(root):
+    source = root / ICON_SOURCE
+    if not source.exists() or Image is None:
+        return []
+
+    assets = root / ASSET_DIR
+    assets.mkdir(exist_ok=True)
+
+    try:
+        img = Image.open(source).convert("RGBA")
+    except OSError:
+        print("Failed to read branding image; bundle the original instead.")
+        return []
+
+    resample = getattr(Image, "Resampling", Image).LANCZOS
+    paths = []
+    for name, size in BRANDING_SIZES.items():
+        path = assets / f"branding_{name}_{size}.png"
+        scaled = img.copy()
+        scaled.thumbnail((size, size), resample)
+        scaled.save(path, optimize=True)
+        paths.append(path)
+    return paths
+
+
+def build_manifest(root, system_name, profile, icon_path, branding_paths=()):
+    data_files = list(DATA_FILES)
+    if not branding_paths:
+        data_files.insert(0, ICON_SOURCE)
+    optimized = profile == "optimized"
+    return {
+        "app": APP_NAME,
+        "system": system_name,
+        "profile": profile,
+        "python": platform.python_version(),
+        "onefile": system_name == "Windows",
+        "optimize": OPTIMIZE_LEVEL if optimized else 0,
+        "env": dict(BUILD_ENV),
+        "modules": list(USED_MODULES) if optimized else ["matplotlib (all)"],
+        "excludes": list(EXCLUDED_MODULES) if optimized else [],
+        "pruned_data": list(PRUNED_MPL_DATA) if optimized else [],
+        "data_files": [name for name in data_files if (root / name).exists()],
+        "branding": [str(Path(path).relative_to(root)) for path in branding_paths],
+        "icon": str(Path(icon_path).relative_to(root)) if icon_path else None,
+    }
+
+
+def write_build_hooks(root, manifest):
+    if not manifest["pruned_data"]:
+        return None
+    hooks_dir = root / ASSET_DIR / HOOKS_DIR
+    hooks_dir.mkdir(parents=True, exist_ok=True)
+    (hooks_dir / "hook-matplotlib.py").write_text(
+        MPL_HOOK_TEMPLATE.format(excludes=manifest["pruned_data"]), encoding="utf-8"
+    )
+    return hooks_dir
+
+
+def build_pyinstaller_command(root, manifest, hooks_dir=None):
+    data_sep = ";" if manifest["system"] == "Windows" else ":"
     cmd = [
         sys.executable,
         "-m",
@@ -78,30 +223,85 @@ def build_pyinstaller_command(root, system_name, icon_path):
         "--windowed",
         "--name",
         APP_NAME,
-        "--collect-all",
-        "matplotlib",
     ]
-    data_files = [ICON_SOURCE, "sample_data.json", "sample_excel.txt"]
-    for filename in data_files:
-        path = root / filename
-        if path.exists():
-            cmd += ["--add-data", f"{path}{data_sep}."]
-    if system_name == "Windows":
+    if manifest["profile"] == "optimized":
+        cmd += ["--optimize", str(manifest["optimize"])]
+        for module in manifest["modules"]:
+            cmd += ["--hidden-import", module]
+        for module in manifest["excludes"]:
+            cmd += ["--exclude-module", module]
+        if hooks_dir:
+            cmd += ["--additional-hooks-dir", str(hooks_dir)]
+    else:
+        cmd += ["--collect-all", "matplotlib"]
+    for filename in manifest["data_files"]:
+        cmd += ["--add-data", f"{root / filename}{data_sep}."]
+    for filename in manifest["branding"]:
+        cmd += ["--add-data", f"{root / filename}{data_sep}{ASSET_DIR}"]
+    if manifest["onefile"]:
         cmd.append("--onefile")
-    if icon_path:
-        cmd += ["--icon", str(icon_path)]
+    if manifest["icon"]:
+        cmd += ["--icon", str(root / manifest["icon"])]
     cmd.append(str(root / ENTRYPOINT))
     return cmd
 
 
-def zip_artifact(root, system_name):
+def artifact_paths(root, system_name):
     dist_dir = root / "dist"
     if system_name == "Windows":
         target = dist_dir / f"{APP_NAME}.exe"
-        zip_path = dist_dir / f"{APP_NAME}-windows.zip"
-    else:
-        target = dist_dir / f"{APP_NAME}.app"
-        zip_path = dist_dir / f"{APP_NAME}-macos.zip"
+        return target, target
+    target = dist_dir / f"{APP_NAME}.app"
+    return target, target / "Contents" / "MacOS" / APP_NAME
+
+
+def bundle_size(path):
+    if path.is_dir():
+        return sum(file_path.stat().st_size for file_path in path.rglob("*") if file_path.is_file())
+    return path.stat().st_size
+
+
+def measure_startup(executable, runs=STARTUP_RUNS):
+    env = dict(os.environ, **{STARTUP_CHECK_ENV: "1"})
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        try:
+            result = subprocess.run([str(executable)], env=env, timeout=STARTUP_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired) as exc:
+            print(f"Startup check failed: {exc}")
+            return []
+        if result.returncode:
+            print(f"Startup check exited with code {result.returncode}.")
+            return []
+        timings.append(round(time.perf_counter() - started, 3))
+    return timings
+
+
+def write_build_report(root, manifest, cmd, zip_path):
+    target, executable = artifact_paths(root, manifest["system"])
+    timings = measure_startup(executable)
+    report = dict(
+        manifest,
+        command=cmd,
+        bundle_bytes=bundle_size(target),
+        zip_bytes=zip_path.stat().st_size,
+        startup_seconds=timings,
+    )
+    report_path = root / "dist" / f"{APP_NAME}-build.json"
+    report_path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    print(f"Bundle size: {report['bundle_bytes'] / 1024 ** 2:.1f} MB ({target.name})")
+    print(f"Zip size: {report['zip_bytes'] / 1024 ** 2:.1f} MB")
+    if timings:
+        print(f"Cold start: {timings[0]:.2f}s (next launches: {', '.join(f'{value:.2f}s' for value in timings[1:])})")
+    return report_path
+
+
+def zip_artifact(root, system_name):
+    target, _executable = artifact_paths(root, system_name)
+    suffix = "windows" if system_name == "Windows" else "macos"
+    zip_path = target.parent / f"{APP_NAME}-{suffix}.zip"
 
     if not target.exists():
         raise FileNotFoundError(f"Build artifact not found: {target}")
@@ -118,23 +318,46 @@ def zip_artifact(root, system_name):
     return zip_path
 
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=f"Build {APP_NAME} with PyInstaller.")
+    parser.add_argument("--profile", choices=PROFILES, default="full")
+    parser.add_argument("--system", choices=("Windows", "Darwin"), help="target OS (defaults to this machine)")
+    parser.add_argument("--dry-run", action="store_true", help="prepare assets, print the command and manifest only")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
     root = Path(__file__).resolve().parent
-    system_name = platform.system()
+    host = platform.system()
+    system_name = args.system or host
     if system_name not in ("Windows", "Darwin"):
-        print("Only Windows and macOS are supported.")
+        if not args.dry_run:
+            print("Only Windows and macOS are supported.")
+            return 2
+        system_name = "Windows"
+    if not args.dry_run and system_name != host:
+        print("PyInstaller does not cross-compile; build on the target OS.")
         return 2
 
-    if not ensure_pyinstaller():
+    if not args.dry_run and not ensure_pyinstaller():
         return 2
 
     icon_path = build_icon(root, system_name)
-    cmd = build_pyinstaller_command(root, system_name, icon_path)
-    print("Running:", " ".join(shlex.quote(part) for part in cmd))
-    subprocess.run(cmd, check=True, cwd=root)
+    branding_paths = build_branding(root)
+    manifest = build_manifest(root, system_name, args.profile, icon_path, branding_paths)
+    hooks_dir = write_build_hooks(root, manifest)
+    cmd = build_pyinstaller_command(root, manifest, hooks_dir)
+    print("Running:" if not args.dry_run else "Command:", " ".join(shlex.quote(part) for part in cmd))
+    if args.dry_run:
+        print(json.dumps(manifest, indent=2, ensure_ascii=False))
+        return 0
+
+    subprocess.run(cmd, check=True, cwd=root, env=dict(os.environ, **manifest["env"]))
 
     zip_path = zip_artifact(root, system_name)
-    print(f"Done: {zip_path}")
+    report_path = write_build_report(root, manifest, cmd, zip_path)
+    print(f"Done: {zip_path} (report: {report_path.name})")
     return 0
 
 
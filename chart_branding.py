@@ -0,0 +1,35 @@
+import os
+import sys
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+BRANDING_SOURCE = "messageImage_1767257219427.jpg"
+BRANDING_DIR = "build_assets"
+BRANDING_SIZES = {"icon": 256, "banner": 96}
+
+
+def resource_path(relative_path):
+    base_path = getattr(sys, "_MEIPASS", os.path.abspath(os.path.dirname(__file__)))
+    return os.path.join(base_path, relative_path)
+
+
+def branding_path(name, size):
+    return resource_path(os.path.join(BRANDING_DIR, f"branding_{name}_{size}.png"))
+
+
+def branding_image(name, size):
+    path = branding_path(name, size)
+    if os.path.exists(path):
+        with Image.open(path) as image:
+            return image.convert("RGBA")
+    source = resource_path(BRANDING_SOURCE)
+    if not os.path.exists(source):
+        return None
+    with Image.open(source) as image:
+        image.draft("RGB", (size, size))
+        image = image.convert("RGBA")
+    image.thumbnail((size, size), getattr(Image, "Resampling", Image).LANCZOS)
+    return image
@@ -0,0 +1,74 @@
+import re
+from functools import lru_cache
+
+from matplotlib.colors import to_rgb
+
+BAND_COLORS = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b"]
+SERIES_PALETTE = ["#60a5fa", "#f59e0b", "#34d399", "#f472b6", "#a78bfa", "#f97316"]
+DEFAULT_SINGLE_COLOR = "#e11d48"
+LIGHT_TEXT = "#f5f5f5"
+DARK_TEXT = "#111111"
+GRID_ALPHA = 0.35
+
+_TK_HEX = re.compile(r"#(?:[0-9a-fA-F]{9}|[0-9a-fA-F]{12})")
+_TK_GRAY = re.compile(r"gr[ae]y(\d{1,3})")
+
+
+@lru_cache(maxsize=1024)
+def color_to_rgb(value):
+    text = str(value).strip()
+    if _TK_HEX.fullmatch(text):
+        digits = (len(text) - 1) // 3
+        scale = 16 ** digits - 1
+        return tuple(int(text[1 + i * digits : 1 + (i + 1) * digits], 16) / scale for i in range(3))
+    name = text.lower().replace(" ", "")
+    gray = _TK_GRAY.fullmatch(name)
+    if gray and int(gray.group(1)) <= 100:
+        level = round(int(gray.group(1)) * 2.55) / 255
+        return level, level, level
+    try:
+        return tuple(float(channel) for channel in to_rgb(name if name.isalpha() else text))
+    except ValueError as exc:
+        raise ValueError(f"無法辨識的顏色：{value}") from exc
+
+
+def to_hex(rgb):
+    return "#" + "".join(f"{int(round(min(max(channel, 0.0), 1.0) * 255)):02x}" for channel in rgb)
+
+
+def normalize_color(value):
+    value = str(value).strip()
+    return to_hex(color_to_rgb(value)) if value else ""
+
+
+@lru_cache(maxsize=256)
+def luminance(value):
+    r, g, b = color_to_rgb(value)
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+
+@lru_cache(maxsize=256)
+def contrast_color(value):
+    return LIGHT_TEXT if luminance(value) < 0.5 else DARK_TEXT
+
+
+@lru_cache(maxsize=1024)
+def blend_color(fg, bg, alpha):
+    fr, fg_c, fb = color_to_rgb(fg)
+    br, bg_c, bb = color_to_rgb(bg)
+    r = fr * alpha + br * (1 - alpha)
+    g = fg_c * alpha + bg_c * (1 - alpha)
+    b = fb * alpha + bb * (1 - alpha)
+    return f"#{int(r * 255):02x}{int(g * 255):02x}{int(b * 255):02x}"
+
+
+def grid_color(chart_bg):
+    return blend_color(contrast_color(chart_bg), chart_bg, GRID_ALPHA)
+
+
+def series_colors(count, line_color="", contrast=LIGHT_TEXT, auto_color=True):
+    if auto_color and count > 1:
+        return [SERIES_PALETTE[idx % len(SERIES_PALETTE)] for idx in range(count)]
+    if count == 1 and not line_color:
+        return [DEFAULT_SINGLE_COLOR]
+    return [line_color or contrast] * count
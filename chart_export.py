@@ -0,0 +1,145 @@
+import os
+
+import numpy as np
+
+from chart_pipeline import XGrid
+
+try:
+    import pyarrow
+    import pyarrow.csv
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+EXPORT_CHUNK_ROWS = 65536
+
+
+def export_filetypes():
+    filetypes = [("CSV", "*.csv"), ("NumPy NPZ", "*.npz")]
+    if pyarrow is not None:
+        filetypes += [("Parquet", "*.parquet"), ("Arrow IPC", "*.arrow")]
+    return filetypes
+
+
+def group_export_series(series):
+    groups = []
+    by_x = {}
+    for name, x_values, y_values in series:
+        key = id(x_values)
+        if key not in by_x:
+            by_x[key] = len(groups)
+            groups.append((x_values.values if isinstance(x_values, XGrid) else x_values, []))
+        groups[by_x[key]][1].append((name, y_values))
+    return groups
+
+
+def export_columns(series):
+    groups = group_export_series(series)
+    columns = []
+    used = set()
+
+    def unique(name):
+        candidate = name
+        suffix = 2
+        while candidate in used:
+            candidate = f"{name} ({suffix})"
+            suffix += 1
+        used.add(candidate)
+        return candidate
+
+    for idx, (x_values, members) in enumerate(groups):
+        columns.append((unique("X" if len(groups) == 1 else f"X{idx + 1}"), x_values))
+        for name, y_values in members:
+            columns.append((unique(name or "序列"), y_values))
+    return columns, max(len(values) for _name, values in columns)
+
+
+def write_series_npz(path, series):
+    groups = group_export_series(series)
+    grid_index = {}
+    for _name, x_values, _y in series:
+        grid_index.setdefault(id(x_values), len(grid_index))
+    arrays = {
+        "names": np.array([name for name, _x, _y in series]),
+        "grid_index": np.array([grid_index[id(x_values)] for _name, x_values, _y in series]),
+    }
+    for idx, (x_values, _members) in enumerate(groups):
+        arrays[f"x_{idx}"] = np.asarray(x_values)
+    for idx, (_name, _x, y_values) in enumerate(series):
+        arrays[f"y_{idx}"] = np.asarray(y_values)
+    with open(path, "wb") as handle:
+        np.savez(handle, **arrays)
+
+
+def arrow_batches(columns, row_count, chunk_rows=EXPORT_CHUNK_ROWS):
+    fields = []
+    for name, values in columns:
+        kind = np.asarray(values).dtype.kind
+        fields.append(pyarrow.field(name, pyarrow.string() if kind in "US" else pyarrow.float64()))
+    schema = pyarrow.schema(fields)
+
+    def batches():
+        for start in range(0, row_count, chunk_rows):
+            stop = min(start + chunk_rows, row_count)
+            arrays = []
+            for (_name, values), field in zip(columns, fields):
+                part = np.asarray(values)[start:stop]
+                missing = stop - start - len(part)
+                array = pyarrow.array(part, type=field.type)
+                if missing:
+                    array = pyarrow.concat_arrays([array, pyarrow.nulls(missing, type=field.type)])
+                arrays.append(array)
+            yield pyarrow.record_batch(arrays, schema=schema)
+
+    return schema, batches()
+
+
+def write_series_csv(path, series, chunk_rows=EXPORT_CHUNK_ROWS):
+    columns, row_count = export_columns(series)
+    header = ",".join(name.replace(",", " ") for name, _values in columns) + "\n"
+    if pyarrow is not None:
+        schema, batches = arrow_batches(columns, row_count, chunk_rows)
+        with open(path, "wb") as handle:
+            handle.write(header.encode("utf-8-sig"))
+            options = pyarrow.csv.WriteOptions(include_header=False)
+            with pyarrow.csv.CSVWriter(handle, schema, write_options=options) as writer:
+                for batch in batches:
+                    writer.write_batch(batch)
+        return
+    formats = ["%s" if np.asarray(values).dtype.kind in "US" else "%.17g" for _name, values in columns]
+    with open(path, "w", encoding="utf-8-sig", newline="") as handle:
+        handle.write(header)
+        lengths = sorted({len(values) for _name, values in columns})
+        for start in range(0, row_count, chunk_rows):
+            stop = min(start + chunk_rows, row_count)
+            edges = [start] + [length for length in lengths if start < length < stop] + [stop]
+            for low, high in zip(edges, edges[1:]):
+                present = [len(values) >= high for _name, values in columns]
+                line = ",".join(fmt if keep else "" for fmt, keep in zip(formats, present)) + "\n"
+                cells = zip(*[np.asarray(values)[low:high].tolist() for (_name, values), keep in zip(columns, present) if keep])
+                handle.write((line * (high - low)) % tuple(cell for row in cells for cell in row))
+
+
+def write_series_arrow(path, series, chunk_rows=EXPORT_CHUNK_ROWS):
+    if pyarrow is None:
+        raise ValueError("匯出 Parquet/Arrow 需要安裝 pyarrow")
+    columns, row_count = export_columns(series)
+    schema, batches = arrow_batches(columns, row_count, chunk_rows)
+    if path.lower().endswith(".parquet"):
+        writer = pyarrow.parquet.ParquetWriter(path, schema)
+    else:
+        writer = pyarrow.ipc.new_file(path, schema)
+    with writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+def write_series(path, series):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".npz":
+        write_series_npz(path, series)
+    elif extension in (".parquet", ".arrow", ".feather"):
+        write_series_arrow(path, series)
+    else:
+        write_series_csv(path, series)
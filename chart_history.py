@@ -0,0 +1,68 @@
+HISTORY_LIMIT = 100
+
+
+class ChartState:
+    __slots__ = ("fields", "texts", "series", "drawn")
+
+    def __init__(self, fields, texts, series, drawn):
+        self.fields = fields
+        self.texts = texts
+        self.series = series
+        self.drawn = drawn
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, ChartState)
+            and self.drawn == other.drawn
+            and self.fields == other.fields
+            and self.texts == other.texts
+            and self.series == other.series
+        )
+
+    def __hash__(self):
+        return hash((self.fields, self.drawn, len(self.series)))
+
+
+def share_state(values, previous):
+    if previous is None:
+        return values
+    if values == previous:
+        return previous
+    if len(values) != len(previous):
+        return values
+    return tuple(old if new == old else new for new, old in zip(values, previous))
+
+
+class ChartHistory:
+    def __init__(self, limit=HISTORY_LIMIT):
+        self.limit = limit
+        self.undo_stack = []
+        self.redo_stack = []
+
+    @property
+    def latest(self):
+        return self.undo_stack[-1] if self.undo_stack else None
+
+    def record(self, state):
+        if state == self.latest:
+            return False
+        self.undo_stack.append(state)
+        del self.undo_stack[: -self.limit]
+        self.redo_stack.clear()
+        return True
+
+    def undo(self, current):
+        if self.latest == current:
+            if len(self.undo_stack) < 2:
+                return None
+            self.undo_stack.pop()
+        if not self.undo_stack:
+            return None
+        self.redo_stack.append(current)
+        return self.undo_stack.pop()
+
+    def redo(self, current):
+        if not self.redo_stack:
+            return None
+        self.undo_stack.append(current)
+        return self.redo_stack.pop()
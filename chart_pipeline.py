@@ -0,0 +1,1270 @@
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+from matplotlib import rcParams
+from matplotlib.collections import PathCollection
+from matplotlib.font_manager import FontProperties
+from matplotlib.path import Path
+from matplotlib.textpath import TextPath
+from matplotlib.ticker import MaxNLocator
+from matplotlib.transforms import Affine2D
+
+from chart_colors import BAND_COLORS, LIGHT_TEXT, series_colors
+from chart_themes import DEFAULT_THEME, clear_data, compile_theme, style_axes, theme_context
+
+rcParams["font.sans-serif"] = ["PingFang TC", "Microsoft JhengHei", "Noto Sans CJK TC", "SimHei", "Arial Unicode MS"]
+rcParams["axes.unicode_minus"] = False
+
+SAVGOL_ORDER = 2
+PROCESS_CACHE_SIZE = 64
+PEAK_CACHE_SIZE = 64
+PARSE_CACHE_SIZE = 64
+SERIES_PROBLEM_LIMIT = 20
+PEAK_DIRECTIONS = ("自動", "向上峰", "向下谷")
+PEAK_LABEL_SIZE = 8
+DERIVED_KINDS = ("無", "差值", "比值", "平均")
+RESAMPLE_METHODS = ("內插", "視窗平均")
+GRID_MAP_CACHE_SIZE = 32
+MEMORY_BUDGET_MB = 1024
+TEXT_COPY_FACTOR = 3
+PASTE_CHUNK_CHARS = 4 * 1024 * 1024
+DEGRADED_POINTS = 200_000
+LOD_POINTS = 4000
+KEY_INLINE_LIMIT = 256
+
+
+def parse_csv_numbers(text, label):
+    raw = [item.strip() for item in text.split(",") if item.strip()]
+    if not raw:
+        raise ValueError(f"{label} 內容為空")
+    try:
+        return [float(item) for item in raw]
+    except ValueError as exc:
+        raise ValueError(f"{label} 含有非數字") from exc
+
+
+def parse_csv_strings(text, label):
+    items = [item.strip() for item in text.split(",") if item.strip()]
+    if not items:
+        raise ValueError(f"{label} 內容為空")
+    return items
+
+
+def parse_interval_notes(text):
+    notes = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        panel = None
+        if line.startswith("["):
+            tag, sep, rest = line[1:].partition("]")
+            if not sep or not tag.strip().isdigit() or int(tag) < 1:
+                raise ValueError("區間圖號格式需為：[圖號]起點,終點,備註")
+            panel = int(tag) - 1
+            line = rest.strip()
+        parts = [p.strip() for p in line.split(",")]
+        if len(parts) < 3:
+            raise ValueError("區間備註格式需為：起點,終點,備註")
+        start = parts[0]
+        end = parts[1]
+        label = ",".join(parts[2:])
+        notes.append((start, end, label, panel))
+    return notes
+
+
+def grid_digest(values):
+    return hashlib.blake2b(values.tobytes(), digest_size=16).digest()
+
+
+class XGrid:
+    def __init__(self, values, digest=None):
+        values = np.array(values, dtype=float)
+        self.digest = digest or grid_digest(values)
+        self.count = len(values)
+        self.monotonic = True
+        self.ascending = True
+        self.uniform = False
+        self.start = float(values[0]) if self.count else 0.0
+        self.stop = float(values[-1]) if self.count else 0.0
+        self.step = 0.0
+        self._values = values
+        if self.count >= 2:
+            steps = np.diff(values)
+            self.ascending = bool(np.all(steps > 0))
+            self.monotonic = self.ascending or bool(np.all(steps < 0))
+            self.step = (self.stop - self.start) / (self.count - 1)
+            if self.monotonic:
+                self.uniform = bool(np.array_equal(np.linspace(self.start, self.stop, self.count), values))
+        if self.uniform:
+            self._values = None
+        else:
+            values.flags.writeable = False
+        if self.monotonic:
+            ends = (self.first, self.last) if self.count else (0.0, 0.0)
+            self.bounds = (min(ends), max(ends))
+        else:
+            self.bounds = (float(values.min()), float(values.max()))
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def values(self):
+        if self._values is None:
+            values = np.linspace(self.start, self.stop, self.count)
+            values.flags.writeable = False
+            self._values = values
+        return self._values
+
+    @property
+    def first(self):
+        return self.start
+
+    @property
+    def last(self):
+        return self.stop
+
+
+def share_x_grid(values, pool):
+    if isinstance(values, XGrid):
+        return pool.setdefault(values.digest, values)
+    values = np.array(values, dtype=float)
+    digest = grid_digest(values)
+    grid = pool.get(digest)
+    if grid is None:
+        grid = XGrid(values, digest)
+        pool[digest] = grid
+    return grid
+
+
+def is_number(value):
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+def parse_excel_block(text):
+    rows = [row for row in text.splitlines() if row.strip()]
+    if not rows:
+        raise ValueError("Excel 貼上內容為空")
+
+    def clean_row(row):
+        return [cell.strip() for cell in row.split("\t")]
+
+    def trim_blanks(cells):
+        cells = list(cells)
+        while cells and cells[-1] == "":
+            cells.pop()
+        return cells
+
+    table = [clean_row(row) for row in rows]
+    if len(table) < 2:
+        raise ValueError("Excel 貼上需至少包含標題列與一列數據")
+
+    max_cols = max(len(row) for row in table)
+    for row in table:
+        if len(row) < max_cols:
+            row.extend([""] * (max_cols - len(row)))
+    empty_cols = [idx for idx in range(max_cols) if all(row[idx] == "" for row in table)]
+    if empty_cols:
+        table = [[cell for idx, cell in enumerate(row) if idx not in empty_cols] for row in table]
+
+    header = table[0]
+    data_rows = table[1:]
+    has_header = any(cell and not is_number(cell) for cell in header)
+
+    x_items = []
+    x_values = []
+    x_unit = ""
+    series_defs = []
+    series_names = set()
+
+    if has_header:
+        header = [cell.strip() for cell in header if cell.strip() != ""]
+        if len(header) < 2:
+            raise ValueError("Excel 標題列需包含 X 與至少一個序列名稱")
+
+        max_cols = max(len(row) for row in data_rows)
+        if len(header) % 2 == 0 and max_cols >= len(header):
+            width = len(header)
+            cells = np.array(data_rows if max_cols == width else [row[:width] for row in data_rows], dtype=str)
+            blank = cells == ""
+            try:
+                numbers = np.where(blank, "nan", cells).astype(float)
+            except ValueError:
+                numbers = None
+            if numbers is not None:
+                pairs = len(header) // 2
+                grid_pool = {}
+                for pair_idx in range(pairs):
+                    x_col = pair_idx * 2
+                    y_col = x_col + 1
+                    keep = ~blank[:, x_col]
+                    filled = np.flatnonzero(keep & ~blank[:, y_col])
+                    if not filled.size:
+                        continue
+                    keep[filled[-1] + 1 :] = False
+                    series_name = header[y_col] or f"序列 {pair_idx + 1}"
+                    if series_name in series_names:
+                        series_name = f"{series_name}-{pair_idx + 1}"
+                    series_names.add(series_name)
+                    x_grid = share_x_grid(numbers[keep, x_col], grid_pool)
+                    series_defs.append((series_name, ",".join(cells[keep, y_col].tolist()), x_grid))
+                    if not x_unit and header[x_col] and not is_number(header[x_col]):
+                        x_unit = header[x_col]
+
+                if not series_defs:
+                    raise ValueError("Excel 貼上內容缺少可用的數據列")
+            else:
+                x_items = header[1:]
+                for row in data_rows:
+                    if not row or len(row) < 2:
+                        continue
+                    name = row[0].strip() or "序列"
+                    values = trim_blanks(row[1:])
+                    if not values:
+                        continue
+                    series_defs.append((name, ",".join(values), None))
+        else:
+            x_items = header[1:]
+            for row in data_rows:
+                if not row or len(row) < 2:
+                    continue
+                name = row[0].strip() or "序列"
+                values = trim_blanks(row[1:])
+                if not values:
+                    continue
+                series_defs.append((name, ",".join(values), None))
+    else:
+        first_row = table[0]
+        if len(first_row) < 2:
+            raise ValueError("Excel 貼上需至少包含 X 與 Y 兩欄")
+        if not all(is_number(cell) for cell in first_row[:2]):
+            raise ValueError("Excel 貼上內容格式不正確")
+        x_vals = []
+        y_vals = []
+        for row in table:
+            if len(row) < 2:
+                continue
+            if not (is_number(row[0]) and (row[1] == "" or is_number(row[1]))):
+                continue
+            x_vals.append(row[0])
+            y_vals.append(row[1])
+        while y_vals and y_vals[-1] == "":
+            x_vals.pop()
+            y_vals.pop()
+        if not x_vals or not y_vals:
+            raise ValueError("Excel 貼上內容缺少數據列")
+        series_defs.append(("序列 1", ",".join(y_vals), XGrid(x_vals)))
+
+    if not series_defs:
+        raise ValueError("Excel 貼上內容缺少數據列")
+
+    return x_items, x_values, x_unit, series_defs
+
+
+def parse_paired_columns(text, chunk_chars=PASTE_CHUNK_CHARS):
+    start = 0
+    header = []
+    while start < len(text) and not header:
+        stop = text.find("\n", start)
+        stop = len(text) if stop < 0 else stop
+        if text[start:stop].strip():
+            header = [cell.strip() for cell in text[start:stop].split("\t")]
+        start = stop + 1
+    if not any(cell and not is_number(cell) for cell in header):
+        return None
+
+    chunks = []
+    while start < len(text):
+        stop = text.find("\n", start + chunk_chars)
+        stop = len(text) if stop < 0 else stop
+        rows = [[cell.strip() for cell in row.split("\t")] for row in text[start:stop].splitlines() if row.strip()]
+        start = stop + 1
+        if not rows:
+            continue
+        width = max(len(row) for row in rows)
+        cells = np.array([row + [""] * (width - len(row)) for row in rows], dtype=str)
+        blank = cells == ""
+        try:
+            chunks.append((np.where(blank, "nan", cells).astype(float), blank))
+        except ValueError:
+            return None
+    if not chunks:
+        return None
+
+    width = max(len(header), max(numbers.shape[1] for numbers, _blank in chunks))
+    numbers = np.full((sum(len(part) for part, _blank in chunks), width), np.nan)
+    blank = np.ones(numbers.shape, dtype=bool)
+    row = 0
+    for part, part_blank in chunks:
+        numbers[row : row + len(part), : part.shape[1]] = part
+        blank[row : row + len(part), : part.shape[1]] = part_blank
+        row += len(part)
+    header += [""] * (width - len(header))
+    used = [idx for idx in range(width) if header[idx] or not blank[:, idx].all()]
+    header = [header[idx] for idx in used if header[idx]]
+    if len(header) < 2 or len(header) % 2 or len(used) < len(header):
+        return None
+    numbers = numbers[:, used[: len(header)]]
+    blank = blank[:, used[: len(header)]]
+
+    x_unit = ""
+    series = []
+    series_names = set()
+    grid_pool = {}
+    for pair_idx in range(len(header) // 2):
+        x_col = pair_idx * 2
+        y_col = x_col + 1
+        keep = ~blank[:, x_col]
+        filled = np.flatnonzero(keep & ~blank[:, y_col])
+        if not filled.size:
+            continue
+        keep[filled[-1] + 1 :] = False
+        series_name = header[y_col] or f"序列 {pair_idx + 1}"
+        if series_name in series_names:
+            series_name = f"{series_name}-{pair_idx + 1}"
+        series_names.add(series_name)
+        series.append((series_name, numbers[keep, y_col], share_x_grid(numbers[keep, x_col], grid_pool)))
+        if not x_unit and not is_number(header[x_col]):
+            x_unit = header[x_col]
+    return (x_unit, series) if series else None
+
+
+@lru_cache(maxsize=32)
+def savgol_coefficients(window, order):
+    half = window // 2
+    offsets = np.arange(-half, half + 1, dtype=float)
+    vander = offsets[:, None] ** np.arange(order + 1)
+    coeffs = np.linalg.pinv(vander)[0]
+    coeffs.flags.writeable = False
+    return coeffs
+
+
+def savgol_smooth(y_values, window, order=SAVGOL_ORDER):
+    window = min(window, len(y_values) if len(y_values) % 2 else len(y_values) - 1)
+    if window <= order + 1:
+        return y_values
+    half = window // 2
+    padded = np.pad(y_values, half, mode="reflect", reflect_type="odd")
+    return np.convolve(padded, savgol_coefficients(window, order)[::-1], mode="valid")
+
+
+def baseline_is_upper(y_values):
+    return bool(np.median(y_values) > (y_values.min() + y_values.max()) / 2)
+
+
+def polynomial_baseline(x_values, y_values, degree, iterations=100, tolerance=1e-3):
+    span = x_values.max() - x_values.min()
+    scaled = (x_values - x_values.min()) / span * 2 - 1 if span else np.zeros_like(x_values)
+    clip = np.maximum if baseline_is_upper(y_values) else np.minimum
+    target = y_values
+    for _ in range(iterations):
+        fit = np.polynomial.polynomial.polyval(scaled, np.polynomial.polynomial.polyfit(scaled, target, degree))
+        clipped = clip(target, fit)
+        change = np.linalg.norm(clipped - target)
+        target = clipped
+        if change <= tolerance * np.linalg.norm(target):
+            break
+    return fit
+
+
+class MemoCache:
+    def __init__(self, max_items=None, max_bytes=None):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key][0]
+
+    def put(self, key, value, nbytes=0):
+        with self._lock:
+            if key in self._items:
+                self.nbytes -= self._items[key][1]
+            self._items[key] = (value, nbytes)
+            self._items.move_to_end(key)
+            self.nbytes += nbytes
+            while self._items and (
+                (self.max_items and len(self._items) > self.max_items)
+                or (self.max_bytes and self.nbytes > self.max_bytes)
+            ):
+                _key, (_value, size) = self._items.popitem(last=False)
+                self.nbytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+
+
+def key_part(value):
+    if isinstance(value, (XGrid, StoredValues)):
+        return value.digest
+    if isinstance(value, str):
+        return (len(value), hash(value)) if len(value) > KEY_INLINE_LIMIT else value
+    if isinstance(value, dict):
+        value = tuple(value.items())
+    if isinstance(value, (tuple, list)):
+        if len(value) > KEY_INLINE_LIMIT:
+            return (len(value), hash(tuple(value)))
+        return tuple(key_part(item) for item in value)
+    return value
+
+
+def cache_key(value):
+    return hashlib.blake2b(repr(key_part(value)).encode("utf-8"), digest_size=16).digest()
+
+
+def parsed_block_nbytes(parsed):
+    x_items, x_values, x_unit, series_defs = parsed
+    nbytes = sys.getsizeof(x_unit)
+    for items in (x_items, x_values):
+        if items:
+            nbytes += sys.getsizeof(items) + len(items) * sys.getsizeof(items[0])
+    for series in series_defs:
+        nbytes += sum(sys.getsizeof(part) for part in series[:2])
+        if len(series) == 3 and isinstance(series[2], XGrid) and not series[2].uniform:
+            nbytes += series[2].values.nbytes
+    return nbytes
+
+
+def panel_nbytes(panel):
+    nbytes = 0
+    for series_x, y_values, _name, _color, _marker in panel["lines"]:
+        nbytes += np.asarray(y_values).nbytes
+        nbytes += series_x.nbytes if isinstance(series_x, np.ndarray) else len(series_x) * 32
+    if panel["peaks"]:
+        nbytes += sum(np.asarray(part).nbytes for part in panel["peaks"])
+    return nbytes
+
+
+def megabytes(nbytes):
+    return f"{nbytes / (1024 * 1024):,.0f} MB"
+
+
+class MemoryMonitor:
+    def __init__(self, budget_mb=MEMORY_BUDGET_MB):
+        self.budget = int(budget_mb * 1024 * 1024)
+        self.stages = {}
+        self.series = {}
+
+    def track(self, stage, nbytes):
+        self.stages[stage] = int(nbytes)
+
+    def track_series(self, name, nbytes):
+        self.series[name] = int(nbytes)
+
+    @property
+    def total(self):
+        return sum(self.stages.values())
+
+    def over_budget(self, extra=0):
+        return self.total + extra > self.budget
+
+    def summary(self):
+        return f"記憶體約 {megabytes(self.total)}／預算 {megabytes(self.budget)}"
+
+    def details(self):
+        visible = 1024 * 1024
+        lines = [f"{stage}：{megabytes(nbytes)}" for stage, nbytes in self.stages.items() if nbytes >= visible]
+        largest = sorted(self.series.items(), key=lambda item: item[1], reverse=True)[:5]
+        lines += [f"序列 {name}：{megabytes(nbytes)}" for name, nbytes in largest if nbytes >= visible]
+        return lines
+
+
+class StoredValues:
+    def __init__(self, values, directory):
+        values = np.ascontiguousarray(values, dtype=float)
+        self.digest = grid_digest(values)
+        self.count = len(values)
+        self.path = os.path.join(directory, f"{self.digest.hex()}.f8")
+        if not os.path.exists(self.path):
+            values.tofile(self.path)
+        if self.count:
+            self.values = np.memmap(self.path, dtype=float, mode="r", shape=(self.count,))
+        else:
+            self.values = values
+
+    def __len__(self):
+        return self.count
+
+    def __eq__(self, other):
+        return isinstance(other, StoredValues) and other.digest == self.digest
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __repr__(self):
+        return f"StoredValues({self.digest.hex()}, {self.count})"
+
+    def summary(self):
+        return f"（{self.count:,} 筆，存於暫存檔）"
+
+
+def series_nbytes(values):
+    if isinstance(values, StoredValues):
+        return 0
+    if isinstance(values, np.ndarray):
+        return values.nbytes
+    return len(values) * TEXT_COPY_FACTOR + (values.count(",") + 1) * 8
+
+
+def decimate_panel(panel, points=DEGRADED_POINTS):
+    lines = []
+    for series_x, y_values, name, color, marker in panel["lines"]:
+        if len(y_values) > points * 2:
+            series_x, y_values = minmax_decimate(np.asarray(series_x, dtype=float), np.asarray(y_values), points)
+        lines.append((series_x, y_values, name, color, marker))
+    return {**panel, "lines": lines}
+
+
+_parse_cache = MemoCache(PARSE_CACHE_SIZE)
+_process_cache = MemoCache(PROCESS_CACHE_SIZE)
+_peak_cache = MemoCache(PEAK_CACHE_SIZE)
+_grid_map_cache = MemoCache(GRID_MAP_CACHE_SIZE)
+
+
+def clear_caches():
+    for cache in (_parse_cache, _process_cache, _peak_cache, _grid_map_cache):
+        cache.clear()
+
+
+def parse_series_values(text):
+    if isinstance(text, StoredValues):
+        return text.values, np.empty(0, dtype=np.intp)
+    key = (len(text), hash(text))
+    cached = _parse_cache.get(key)
+    if cached is not None:
+        return cached
+    tokens = text.split(",")
+    bad_rows = np.empty(0, dtype=np.intp)
+    try:
+        values = np.array(tokens, dtype=float)
+    except ValueError:
+        tokens = [token.strip() for token in tokens]
+        while tokens and not tokens[-1]:
+            tokens.pop()
+        tokens = [token or "nan" for token in tokens]
+        try:
+            values = np.array(tokens, dtype=float)
+        except ValueError:
+            values = np.full(len(tokens), np.nan)
+            bad = []
+            for idx, token in enumerate(tokens):
+                try:
+                    values[idx] = float(token)
+                except ValueError:
+                    bad.append(idx)
+            bad_rows = np.array(bad, dtype=np.intp)
+    values.setflags(write=False)
+    _parse_cache.put(key, (values, bad_rows))
+    return values, bad_rows
+
+
+def series_values(text, label):
+    if isinstance(text, np.ndarray):
+        values = text
+    else:
+        values, bad_rows = parse_series_values(text)
+        if len(bad_rows):
+            raise ValueError(f"{label} 含有非數字")
+    if not len(values):
+        raise ValueError(f"{label} 內容為空")
+    if np.isnan(values).all():
+        raise ValueError(f"{label} 沒有有效數值")
+    return values
+
+
+def check_series(name, values_text, x_grid, x_items, allow_negative):
+    label = name or "序列"
+    values, bad_rows = parse_series_values(values_text)
+    problems = []
+
+    def add_rows(rows, describe):
+        for row in rows[:SERIES_PROBLEM_LIMIT]:
+            problems.append((label, int(row) + 1, describe(row)))
+        if len(rows) > SERIES_PROBLEM_LIMIT:
+            problems.append((label, None, f"另有 {len(rows) - SERIES_PROBLEM_LIMIT} 筆相同問題未列出"))
+
+    if not len(values):
+        problems.append((label, None, "內容為空"))
+        return problems
+    add_rows(bad_rows, lambda _row: "含有非數字")
+    if not len(bad_rows) and np.isnan(values).all():
+        problems.append((label, None, "沒有有效數值"))
+    if x_grid:
+        expected = len(x_grid)
+    elif x_items:
+        expected = len(x_items)
+    else:
+        expected = None
+        problems.append((label, None, "請輸入 X 軸項目或使用 Excel 貼上"))
+    if expected is not None and len(values) != expected:
+        problems.append((label, min(len(values), expected) + 1, f"數值數量 {len(values)} 與 X 數量 {expected} 不符"))
+    if not allow_negative:
+        add_rows(np.flatnonzero(values < 0), lambda row: f"負值 {values[row]:g}（已勾選不允許負值）")
+    return problems
+
+
+def validate_series(series, x_items, allow_negative, executor=None):
+    def check(item):
+        name, values_text, x_grid = item
+        return check_series(name, values_text, x_grid, x_items, allow_negative)
+
+    if executor is not None and len(series) > 1:
+        results = executor.map(check, series)
+    else:
+        results = map(check, series)
+    return [problem for problems in results for problem in problems]
+
+
+def fill_gaps(y_values):
+    gaps = np.isnan(y_values)
+    if not gaps.any():
+        return y_values, None
+    filled = np.array(y_values, dtype=float)
+    positions = np.flatnonzero(~gaps)
+    filled[gaps] = np.interp(np.flatnonzero(gaps), positions, filled[positions])
+    return filled, gaps
+
+
+class GridMap:
+    def __init__(self, x_values, grid, method=RESAMPLE_METHODS[0]):
+        x_values = np.asarray(x_values, dtype=float)
+        grid = np.asarray(grid, dtype=float)
+        self.order = None
+        if len(x_values) > 1:
+            steps = np.diff(x_values)
+            if np.all(steps < 0):
+                self.order = slice(None, None, -1)
+            elif not np.all(steps > 0):
+                self.order = np.argsort(x_values, kind="stable")
+            if self.order is not None:
+                x_values = x_values[self.order]
+        self.count = len(x_values)
+        self.size = len(grid)
+        self.window = None
+        if self.count < 2:
+            self.left = self.right = np.zeros(len(grid), dtype=np.intp)
+            self.weight = np.zeros(len(grid))
+            self.outside = grid != x_values[0] if self.count else np.ones(len(grid), dtype=bool)
+            return
+
+        right = np.clip(np.searchsorted(x_values, grid), 1, self.count - 1)
+        left = right - 1
+        span = x_values[right] - x_values[left]
+        weight = np.divide(grid - x_values[left], span, out=np.zeros(len(grid)), where=span > 0)
+        at_right = weight >= 1
+        left[at_right] = right[at_right]
+        at_left = weight <= 0
+        right[at_left] = left[at_left]
+        weight[at_right | at_left] = 0.0
+        self.left = left
+        self.right = right
+        self.weight = weight
+        self.outside = (grid < x_values[0]) | (grid > x_values[-1])
+
+        if method == RESAMPLE_METHODS[1] and len(grid) > 1:
+            middle = (grid[1:] + grid[:-1]) / 2
+            lower = np.concatenate(([1.5 * grid[0] - 0.5 * grid[1]], middle))
+            upper = np.concatenate((middle, [1.5 * grid[-1] - 0.5 * grid[-2]]))
+            self.window = (
+                np.searchsorted(x_values, np.minimum(lower, upper)),
+                np.searchsorted(x_values, np.maximum(lower, upper)),
+            )
+
+    def apply(self, y_values):
+        if not self.count:
+            return np.full(self.size, np.nan)
+        y_values = np.asarray(y_values, dtype=float)
+        if self.order is not None:
+            y_values = y_values[self.order]
+        result = y_values[self.left] * (1 - self.weight) + y_values[self.right] * self.weight
+        result[self.outside] = np.nan
+        if self.window is not None:
+            starts, stops = self.window
+            present = ~np.isnan(y_values)
+            sums = np.concatenate(([0.0], np.cumsum(np.where(present, y_values, 0.0))))
+            counts = np.concatenate(([0], np.cumsum(present)))
+            filled = counts[stops] - counts[starts]
+            dense = filled > 1
+            result[dense] = (sums[stops] - sums[starts])[dense] / filled[dense]
+        return result
+
+
+def grid_map(source, target, method=RESAMPLE_METHODS[0]):
+    key = (source.digest, target.digest, method)
+    mapping = _grid_map_cache.get(key)
+    if mapping is None:
+        mapping = GridMap(source.values, target.values, method)
+        _grid_map_cache.put(key, mapping)
+    return mapping
+
+
+def align_series(x_values, y_values, grid):
+    return GridMap(x_values, grid).apply(y_values)
+
+
+def derive_series(kind, items, method=RESAMPLE_METHODS[0]):
+    if len(items) < 2:
+        raise ValueError("衍生序列需至少兩條序列")
+    ref_name, ref_grid, ref_values = items[0]
+    values = [np.asarray(ref_values, dtype=float)]
+    for name, x_grid, y_values in items[1:]:
+        if (x_grid is None) != (ref_grid is None):
+            raise ValueError("衍生序列需所有序列皆有 X 數值，或皆使用 X 軸項目")
+        if x_grid is not None and x_grid.digest != ref_grid.digest:
+            y_values = grid_map(x_grid, ref_grid, method).apply(y_values)
+        elif len(y_values) != len(ref_values):
+            raise ValueError(f"{name} 數值數量與 {ref_name} 不同")
+        values.append(np.asarray(y_values, dtype=float))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if kind == "差值":
+            name = f"{ref_name} − {items[1][0]}"
+            result = values[0] - values[1]
+        elif kind == "比值":
+            name = f"{ref_name} / {items[1][0]}"
+            result = values[0] / values[1]
+            result[~np.isfinite(result)] = np.nan
+        else:
+            name = f"平均（{len(values)} 條）"
+            result = values[0].copy()
+            for other in values[1:]:
+                result += other
+            result /= len(values)
+    if np.isnan(result).all():
+        raise ValueError("衍生序列沒有重疊的 X 範圍")
+    result.flags.writeable = False
+    return name, result
+
+
+def process_series(y_values, x_grid, processing):
+    window, degree = processing
+    key = (grid_digest(y_values), x_grid.digest if x_grid else len(y_values), window, degree)
+    result = _process_cache.get(key)
+    if result is not None:
+        return result
+
+    result, gaps = fill_gaps(y_values)
+    if window:
+        result = savgol_smooth(result, window)
+    if degree is not None:
+        x_values = x_grid.values if x_grid else np.arange(len(y_values), dtype=float)
+        result = result - polynomial_baseline(x_values, result, degree)
+    result = np.array(result, dtype=float)
+    if gaps is not None:
+        result[gaps] = np.nan
+    result.flags.writeable = False
+    _process_cache.put(key, result)
+    return result
+
+
+def _peak_bases(heights, bases):
+    pointer = np.arange(len(heights)) - 1
+    bases = bases.copy()
+    active = pointer[1:] + 1
+    while active.size:
+        active = active[heights[pointer[active]] <= heights[active]]
+        target = pointer[active]
+        bases[active] = np.minimum(bases[active], bases[target])
+        pointer[active] = pointer[target]
+        active = active[pointer[active] >= 0]
+    return bases
+
+
+def _segment_minima(y_values, steps, peaks):
+    valleys = np.flatnonzero((steps[:-1] <= 0) & (steps[1:] > 0)) + 1
+    lead = int(valleys.size > 0 and valleys[0] < peaks[0])
+    minima = np.concatenate((y_values[:1], y_values[valleys[lead:lead + len(peaks) - 1]], y_values[-1:]))
+    if lead:
+        minima[0] = min(minima[0], y_values[valleys[0]])
+    if len(valleys) > lead + len(peaks) - 1:
+        minima[-1] = min(minima[-1], y_values[valleys[-1]])
+    return minima
+
+
+def _peak_prominences(heights, segment_min):
+    prominences = np.empty(len(heights))
+    index = np.arange(len(heights))
+    segment_min = segment_min.copy()
+    while index.size:
+        level = heights[index]
+        lower = np.ones(len(level), dtype=bool)
+        lower[1:] &= level[1:] < level[:-1]
+        lower[:-1] &= level[:-1] < level[1:]
+        removed = np.flatnonzero(lower)
+        if len(removed) * 16 < len(index):
+            break
+        prominences[index[removed]] = level[removed] - np.maximum(segment_min[removed], segment_min[removed + 1])
+        segment_min[removed + 1] = np.minimum(segment_min[removed], segment_min[removed + 1])
+        segment_min = segment_min[np.append(~lower, True)]
+        index = index[~lower]
+    if index.size:
+        level = heights[index]
+        left_base = _peak_bases(level, segment_min[:-1])
+        right_base = _peak_bases(level[::-1], segment_min[:0:-1])[::-1]
+        prominences[index] = level - np.maximum(left_base, right_base)
+    return prominences
+
+
+def _crossing_blocks(y_values, block=1024):
+    pad = (-len(y_values)) % block
+    blocks = np.concatenate((y_values, np.full(pad, np.inf))).reshape(-1, block)
+    return blocks, blocks.min(axis=1)
+
+
+def _left_crossings(crossing_blocks, positions, levels, chunk=256):
+    blocks, block_min = crossing_blocks
+    block = blocks.shape[1]
+    block_ids = np.arange(len(block_min))
+    offsets = np.arange(block)
+    crossings = np.full(len(positions), -1)
+    for start in range(0, len(positions), chunk):
+        pos = positions[start:start + chunk]
+        level = levels[start:start + chunk, None]
+        own = pos // block
+        inside = (blocks[own] < level) & (own[:, None] * block + offsets < pos[:, None])
+        found = inside.any(axis=1)
+        hit = own * block + block - 1 - np.argmax(inside[:, ::-1], axis=1)
+        earlier = (block_min < level) & (block_ids < own[:, None])
+        prev_block = len(block_min) - 1 - np.argmax(earlier[:, ::-1], axis=1)
+        prev_hit = prev_block * block + block - 1 - np.argmax((blocks[prev_block] < level)[:, ::-1], axis=1)
+        crossings[start:start + chunk] = np.where(found, hit, np.where(earlier.any(axis=1), prev_hit, -1))
+    return crossings
+
+
+def find_peaks(y_values, prominence=None, width=0, max_count=20, valleys=False):
+    y_values = -np.asarray(y_values, dtype=float) if valleys else np.asarray(y_values, dtype=float)
+    if len(y_values) < 3:
+        return np.empty(0, dtype=int)
+    if prominence is None:
+        prominence = 0.05 * (y_values.max() - y_values.min())
+    steps = np.diff(y_values)
+    peaks = np.flatnonzero((steps[:-1] > 0) & (steps[1:] <= 0)) + 1
+    if not peaks.size:
+        return peaks
+
+    prominences = _peak_prominences(y_values[peaks], _segment_minima(y_values, steps, peaks))
+    keep = (prominences > 0) & (prominences >= prominence)
+    if width <= 1 and np.count_nonzero(keep) > max_count:
+        keep &= prominences >= np.partition(prominences[keep], -max_count)[-max_count]
+    peaks = peaks[keep]
+    prominences = prominences[keep]
+    strongest = np.argsort(prominences, kind="stable")[::-1]
+
+    if width > 1 and peaks.size:
+        last = len(y_values) - 1
+        forward = _crossing_blocks(y_values)
+        backward = _crossing_blocks(y_values[::-1])
+        wide = []
+        found = 0
+        start = 0
+        batch = max(4 * max_count, 64)
+        while start < len(strongest) and found < max_count:
+            part = strongest[start:start + batch]
+            contour = y_values[peaks[part]] - prominences[part] / 2
+            left = _left_crossings(forward, peaks[part], contour)
+            right = last - _left_crossings(backward, last - peaks[part], contour)
+            part = part[right - left - 1 >= width]
+            wide.append(part)
+            found += len(part)
+            start += batch
+            batch *= 2
+        strongest = np.concatenate(wide) if wide else strongest[:0]
+
+    return np.sort(peaks[strongest[:max_count]])
+
+
+def detect_series_peaks(series_x, y_values, peak_settings):
+    prominence, width, max_count, direction = peak_settings
+    x_values = np.asarray(series_x, dtype=float)
+    key = (grid_digest(x_values), grid_digest(y_values), peak_settings)
+    cached = _peak_cache.get(key)
+    if cached is not None:
+        return cached
+    filled, gaps = fill_gaps(y_values)
+    if direction == "自動":
+        valleys = baseline_is_upper(filled)
+    else:
+        valleys = direction == "向下谷"
+    indices = find_peaks(filled, prominence, width, max_count, valleys)
+    if gaps is not None:
+        indices = indices[~gaps[indices]]
+    result = (x_values[indices], np.asarray(y_values)[indices], valleys)
+    _peak_cache.put(key, result)
+    return result
+
+
+def label_tiers(centers, widths, below, padding=1):
+    tiers = np.zeros(len(centers), dtype=int)
+    tier_ends = {}
+    for idx in np.argsort(centers, kind="stable"):
+        ends = tier_ends.setdefault(bool(below[idx]), [])
+        left = centers[idx] - widths[idx] / 2 - padding
+        tier = next((tier for tier, end in enumerate(ends) if end <= left), len(ends))
+        if tier == len(ends):
+            ends.append(0.0)
+        ends[tier] = centers[idx] + widths[idx] / 2 + padding
+        tiers[idx] = tier
+    return tiers
+
+
+def peak_label_collection(ax, x_values, y_values, below, color):
+    labels = [f"{value:g}" for value in x_values]
+    prop = FontProperties(family="DejaVu Sans")
+    text_paths = [TextPath((0, 0), label, size=PEAK_LABEL_SIZE, prop=prop) for label in labels]
+    extents = np.array([path.get_extents().bounds for path in text_paths]).reshape(-1, 4)
+    collection = PathCollection(
+        [],
+        offsets=np.column_stack((x_values, y_values)),
+        offset_transform=ax.transData,
+        facecolors=color,
+        edgecolors="none",
+    )
+    collection.set_transform(Affine2D().scale(1 / 72) + ax.figure.dpi_scale_trans)
+    collection.set_clip_on(False)
+    collection.set_gid("peak-labels")
+    collection.peak_labels = (x_values, y_values, below, text_paths, extents[:, 2], extents[:, 3])
+    pack_peak_labels(ax, collection)
+    return collection
+
+
+def pack_peak_labels(ax, collection):
+    x_values, y_values, below, text_paths, widths, heights = collection.peak_labels
+    display_x = ax.transData.transform(np.column_stack((x_values, y_values)))[:, 0] * 72 / ax.figure.dpi
+    tiers = label_tiers(display_x, widths, below)
+    lift = 6 + tiers * (PEAK_LABEL_SIZE + 2)
+    shift_y = np.where(below, -lift - heights, lift)
+    paths = [
+        Path(text_path.vertices + (-width / 2, dy), text_path.codes)
+        for text_path, width, dy in zip(text_paths, widths, shift_y)
+    ]
+    collection.set_paths(paths)
+
+
+def draw_peaks(ax, peaks, color):
+    x_values, y_values, colors, below = peaks
+    if not len(x_values):
+        return
+    ax.scatter(x_values, y_values, c=colors, s=22, marker="o", edgecolors=color, linewidths=0.6, zorder=3)
+    ax.add_collection(peak_label_collection(ax, x_values, y_values, below, color), autolim=False)
+
+
+def build_settings(
+    x_items=(),
+    x_values=(),
+    allow_negative=True,
+    ymin=None,
+    ymax=None,
+    line_color="",
+    contrast=LIGHT_TEXT,
+    auto_color=True,
+    processed=True,
+    peaks=None,
+    derived=None,
+):
+    return {
+        "x_items": tuple(x_items),
+        "x_values": tuple(float(value) for value in x_values),
+        "allow_negative": bool(allow_negative),
+        "ymin": ymin,
+        "ymax": ymax,
+        "line_color": line_color,
+        "contrast": contrast,
+        "auto_color": bool(auto_color),
+        "processed": bool(processed),
+        "peaks": peaks or None,
+        "derived": derived or None,
+    }
+
+
+def prepare_panel(settings, series, notes):
+    panel = {
+        "lines": [],
+        "bands": [],
+        "peaks": None,
+        "xlim": None,
+        "invert_x": False,
+        "ylim": None,
+        "numeric_x": False,
+        "xticks": ([], []),
+    }
+    if not series:
+        return panel
+
+    x_items = settings["x_items"]
+    x_values = settings["x_values"]
+    y_values_list = []
+    for name, values_text, x_grid, _processing in series:
+        y_values = series_values(values_text, name or "序列")
+        if x_grid:
+            if len(y_values) != len(x_grid):
+                raise ValueError(f"{name} 數值數量需與 X 數值相同")
+        else:
+            if not x_items:
+                raise ValueError("請輸入 X 軸項目或使用 Excel 貼上")
+            if len(y_values) != len(x_items):
+                raise ValueError(f"{name} 數值數量需與 X 軸項目相同")
+        y_values_list.append(y_values)
+
+    if not settings["allow_negative"]:
+        for y_values in y_values_list:
+            if (y_values < 0).any():
+                raise ValueError("已勾選不允許負值")
+
+    if settings["processed"]:
+        y_values_list = [
+            process_series(y_values, x_grid, processing) if processing else y_values
+            for (_name, _values_text, x_grid, processing), y_values in zip(series, y_values_list)
+        ]
+
+    ymin = settings["ymin"]
+    ymax = settings["ymax"]
+    if ymin is None:
+        ymin = min(float(np.nanmin(y_values)) for y_values in y_values_list)
+    if ymax is None:
+        ymax = max(float(np.nanmax(y_values)) for y_values in y_values_list)
+    if not settings["allow_negative"]:
+        ymin = max(0, ymin)
+    panel["ylim"] = (ymin, ymax)
+
+    label_grid = series[0][2] if not x_items else None
+    x_positions = range(len(label_grid) if label_grid else len(x_items))
+
+    use_numeric_x = False
+    numeric_x_values = []
+    if label_grid:
+        use_numeric_x = True
+        numeric_x_values = label_grid.values
+    elif x_values and x_items and len(x_values) == len(x_items):
+        use_numeric_x = True
+        numeric_x_values = list(x_values)
+    else:
+        if x_items:
+            try:
+                numeric_x_values = [float(value) for value in x_items]
+                use_numeric_x = True
+            except ValueError:
+                use_numeric_x = False
+
+    def resolve_x_boundary(value):
+        value = value.strip()
+        if not value:
+            raise ValueError("區間起點/終點不可為空")
+        try:
+            numeric = float(value)
+        except ValueError:
+            if value in x_items:
+                return x_positions[x_items.index(value)]
+            raise ValueError(f"找不到對應的 X 軸項目：{value}")
+        if label_grid or (x_values and len(x_values) == len(x_items)):
+            return numeric
+        if 0 <= numeric <= len(x_positions) - 1:
+            return numeric
+        if 1 <= numeric <= len(x_positions):
+            return numeric - 1
+        return numeric
+
+    for idx, (start_raw, end_raw, label) in enumerate(notes):
+        start = resolve_x_boundary(start_raw)
+        end = resolve_x_boundary(end_raw)
+        if start > end:
+            start, end = end, start
+        color = BAND_COLORS[idx % len(BAND_COLORS)]
+        panel["bands"].append((start, end, color, f"{label}（{start:g}~{end:g}）"))
+
+    series_x_bounds = []
+    series_x_first = None
+    series_x_last = None
+    colors = series_colors(len(y_values_list), settings["line_color"], settings["contrast"], settings["auto_color"])
+    for idx, ((name, _values_text, x_grid, _processing), y_values) in enumerate(zip(series, y_values_list)):
+        if x_grid:
+            series_x = x_grid.values
+            series_x_bounds.append(x_grid.bounds)
+            use_numeric_x = True
+        else:
+            if use_numeric_x and len(numeric_x_values):
+                series_x = numeric_x_values
+            else:
+                series_x = x_positions
+            if len(series_x):
+                series_x_bounds.append((float(np.min(series_x)), float(np.max(series_x))))
+        if len(series_x):
+            if series_x_first is None:
+                series_x_first = series_x[0]
+            series_x_last = series_x[-1]
+        marker = "o" if len(y_values) <= 60 else None
+        panel["lines"].append((series_x, y_values, name, colors[idx], marker))
+
+    if settings["derived"] and len(panel["lines"]) > 1:
+        kind, method = settings["derived"]
+        shared_grid = None
+        if label_grid:
+            shared_grid = label_grid
+        elif use_numeric_x and len(numeric_x_values):
+            shared_grid = XGrid(numeric_x_values)
+        items = [
+            (name or "序列", x_grid or shared_grid, y_values)
+            for (name, _values_text, x_grid, _processing), y_values in zip(series, y_values_list)
+        ]
+        name, derived_values = derive_series(kind, items, method)
+        marker = "o" if len(derived_values) <= 60 else None
+        panel["lines"].append((panel["lines"][0][0], derived_values, name, settings["contrast"], marker))
+        ymin, ymax = panel["ylim"]
+        if settings["ymin"] is None:
+            ymin = min(ymin, float(np.nanmin(derived_values)))
+            if not settings["allow_negative"]:
+                ymin = max(0, ymin)
+        if settings["ymax"] is None:
+            ymax = max(ymax, float(np.nanmax(derived_values)))
+        panel["ylim"] = (ymin, ymax)
+
+    if settings["peaks"]:
+        peak_x = []
+        peak_y = []
+        peak_colors = []
+        peak_below = []
+        for series_x, y_values, _name, color, _marker in panel["lines"]:
+            found_x, found_y, valleys = detect_series_peaks(series_x, y_values, settings["peaks"])
+            peak_x.append(found_x)
+            peak_y.append(found_y)
+            peak_colors.extend([color] * len(found_x))
+            peak_below.append(np.full(len(found_x), valleys))
+        panel["peaks"] = (np.concatenate(peak_x), np.concatenate(peak_y), peak_colors, np.concatenate(peak_below))
+
+    if series_x_bounds:
+        x_low = min(bounds[0] for bounds in series_x_bounds)
+        x_high = max(bounds[1] for bounds in series_x_bounds)
+        if panel["bands"]:
+            x_low = min(x_low, min(band[0] for band in panel["bands"]))
+            x_high = max(x_high, max(band[1] for band in panel["bands"]))
+        panel["xlim"] = (x_low, x_high)
+        panel["invert_x"] = series_x_first > series_x_last
+
+    panel["numeric_x"] = use_numeric_x
+    if not use_numeric_x:
+        panel["xticks"] = (x_positions, list(x_items))
+    return panel
+
+
+def draw_panel(ax, panel, style, xlim=None, ylim=None):
+    theme = compile_theme(style.get("theme", DEFAULT_THEME), style["chart_bg"])
+    if getattr(ax, "chart_theme", None) != theme["key"]:
+        style_axes(ax, theme)
+    clear_data(ax)
+    with theme_context(theme):
+        lod_lines = draw_panel_data(ax, panel, style, theme, xlim, ylim)
+    if not getattr(ax, "lod_connected", False):
+        ax.callbacks.connect("xlim_changed", refresh_lod)
+        ax.lod_connected = True
+    if lod_lines:
+        refresh_lod(ax)
+
+
+def draw_panel_data(ax, panel, style, theme, xlim, ylim):
+    for start, end, color, label in panel["bands"]:
+        ax.axvspan(start, end, facecolor=color, alpha=0.18, label=label)
+    lod_lines = []
+    for series_x, y_values, name, color, marker in panel["lines"]:
+        if len(y_values) > LOD_POINTS * 2:
+            series_x = np.asarray(series_x, dtype=float)
+            (line,) = ax.plot(*minmax_decimate(series_x, y_values, LOD_POINTS), marker=marker, label=name, color=color)
+            line.lod_source = (series_x, y_values)
+            lod_lines.append(line)
+        else:
+            ax.plot(series_x, y_values, marker=marker, label=name, color=color)
+
+    if xlim:
+        ax.set_xlim(*xlim)
+    elif panel["xlim"]:
+        x_low, x_high = panel["xlim"]
+        ax.set_xlim((x_high, x_low) if panel["invert_x"] else (x_low, x_high))
+
+    if panel["numeric_x"]:
+        ax.xaxis.set_major_locator(MaxNLocator(nbins=8))
+    elif panel["lines"]:
+        xtick_positions, xtick_labels = panel["xticks"]
+        ax.set_xticks(xtick_positions)
+        ax.set_xticklabels(xtick_labels)
+        if len(xtick_labels) > 8:
+            ax.tick_params(axis="x", labelrotation=45)
+    ax.set_xlabel(style["x_unit"])
+    ax.set_ylabel(style["y_unit"])
+
+    ylim = ylim or panel["ylim"]
+    if ylim:
+        ymin, ymax = ylim
+        ax.set_ylim(ymin, ymax)
+        interval = style["interval"]
+        if interval:
+            ticks = []
+            current = ymin
+            while current <= ymax + 1e-9:
+                ticks.append(current)
+                current += interval
+            ax.set_yticks(ticks)
+
+    if panel["peaks"]:
+        draw_peaks(ax, panel["peaks"], theme["contrast"])
+
+    if panel["lines"] or panel["bands"]:
+        ax.legend()
+    return lod_lines
+
+
+def lod_slice(x_values, y_values, xlim, buckets):
+    low, high = min(xlim), max(xlim)
+    if len(x_values) > 1 and x_values[0] <= x_values[-1]:
+        start = max(int(np.searchsorted(x_values, low)) - 1, 0)
+        stop = int(np.searchsorted(x_values, high, side="right")) + 1
+    elif len(x_values) > 1:
+        start = max(len(x_values) - int(np.searchsorted(x_values[::-1], high, side="right")) - 1, 0)
+        stop = len(x_values) - int(np.searchsorted(x_values[::-1], low)) + 1
+    else:
+        start, stop = 0, len(x_values)
+    return minmax_decimate(x_values[start:stop], y_values[start:stop], buckets)
+
+
+def refresh_lod(ax):
+    buckets = max(int(ax.bbox.width), LOD_POINTS // 4)
+    xlim = ax.get_xlim()
+    for line in ax.get_lines():
+        source = getattr(line, "lod_source", None)
+        if source is not None:
+            line.set_data(*lod_slice(source[0], source[1], xlim, buckets))
+    for collection in ax.collections:
+        if getattr(collection, "peak_labels", None) is not None:
+            pack_peak_labels(ax, collection)
+
+
+def minmax_decimate(x_values, y_values, buckets):
+    count = len(y_values)
+    if buckets < 1 or count <= buckets * 2:
+        return x_values, y_values
+    size = count // buckets
+    usable = size * buckets
+    block = y_values[:usable].reshape(buckets, size)
+    starts = np.arange(buckets) * size
+    nan_block = np.isnan(block)
+    low = np.where(nan_block, np.inf, block).argmin(axis=1) + starts
+    high = np.where(nan_block, -np.inf, block).argmax(axis=1) + starts
+    gaps = np.flatnonzero(nan_block.any(axis=1))
+    gap_index = nan_block[gaps].argmax(axis=1) + starts[gaps]
+    indices = np.unique(np.concatenate((low, high, gap_index, np.arange(usable, count))))
+    return x_values[indices], y_values[indices]
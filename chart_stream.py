@@ -0,0 +1,87 @@
+import os
+import threading
+
+import numpy as np
+
+STREAM_CAPACITY = 200_000
+
+
+class RingBuffer:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.size = 0
+        self._data = np.full(capacity * 2, np.nan)
+        self._next = 0
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=float).ravel()[-self.capacity:]
+        positions = (self._next + np.arange(len(values))) % self.capacity
+        self._data[positions] = values
+        self._data[positions + self.capacity] = values
+        self._next = (self._next + len(values)) % self.capacity
+        self.size = min(self.size + len(values), self.capacity)
+
+    def view(self):
+        end = self._next + self.capacity
+        return self._data[end - self.size:end]
+
+
+class StreamSeries:
+    def __init__(self, name, capacity=STREAM_CAPACITY):
+        self.name = name
+        self.x = RingBuffer(capacity)
+        self.y = RingBuffer(capacity)
+        self._lock = threading.Lock()
+
+    def append(self, x_values, y_values):
+        x_values = np.atleast_1d(np.asarray(x_values, dtype=float))
+        y_values = np.atleast_1d(np.asarray(y_values, dtype=float))
+        if len(x_values) != len(y_values):
+            raise ValueError(f"{self.name} 的 X 與 Y 數量不一致")
+        with self._lock:
+            self.x.extend(x_values)
+            self.y.extend(y_values)
+
+    def snapshot(self, window=None):
+        with self._lock:
+            x_values = self.x.view()
+            y_values = self.y.view()
+            start = 0
+            if window and len(x_values):
+                start = int(np.searchsorted(x_values, x_values[-1] - window))
+            return x_values[start:].copy(), y_values[start:].copy()
+
+
+class FileTailSource:
+    def __init__(self, path):
+        self.path = path
+        self.names = None
+        self._offset = 0
+        self._partial = b""
+
+    def read(self):
+        with open(self.path, "rb") as handle:
+            handle.seek(0, os.SEEK_END)
+            if handle.tell() < self._offset:
+                self._offset = 0
+                self._partial = b""
+            handle.seek(self._offset)
+            chunk = handle.read()
+            self._offset = handle.tell()
+        complete, _, self._partial = (self._partial + chunk).rpartition(b"\n")
+        lines = [line for line in complete.decode("utf-8", "replace").splitlines() if line.strip()]
+        if not lines:
+            return None
+        if self.names is None:
+            cells = [cell.strip() for cell in lines[0].split("\t")]
+            try:
+                [float(cell) for cell in cells if cell]
+            except ValueError:
+                self.names = [cell or f"序列 {idx}" for idx, cell in enumerate(cells[1:], start=1)]
+                lines = lines[1:]
+            else:
+                self.names = [f"序列 {idx}" for idx in range(1, len(cells))]
+        if not lines:
+            return None
+        rows = np.atleast_2d(np.genfromtxt(lines, delimiter="\t", dtype=float, invalid_raise=False))
+        return rows if rows.shape[1] >= 2 else None
@@ -0,0 +1,125 @@
+from functools import lru_cache
+
+import numpy as np
+from matplotlib import rc_context
+from matplotlib.colors import same_color, to_rgb
+from matplotlib.ticker import AutoLocator, ScalarFormatter
+
+from chart_colors import contrast_color, grid_color, normalize_color
+
+DEFAULT_THEME = "dark"
+THEMES = {
+    "dark": {"chart_bg": "#0f1217", "line_width": 1.5, "grid_style": "--", "grid_alpha": 0.5, "font_size": 10},
+    "light": {"chart_bg": "#ffffff", "line_width": 1.5, "grid_style": "--", "grid_alpha": 0.5, "font_size": 10},
+    "print": {"chart_bg": "#ffffff", "line_width": 1.2, "grid_style": ":", "grid_alpha": 0.8, "font_size": 11},
+}
+THEME_LABELS = {"深色": "dark", "淺色": "light", "列印": "print"}
+
+
+@lru_cache(maxsize=64)
+def compile_theme(name=DEFAULT_THEME, chart_bg=None):
+    base = THEMES.get(name, THEMES[DEFAULT_THEME])
+    chart_bg = normalize_color(chart_bg or base["chart_bg"])
+    contrast = contrast_color(chart_bg)
+    grid = grid_color(chart_bg)
+    rc = {
+        "figure.facecolor": chart_bg,
+        "savefig.facecolor": chart_bg,
+        "axes.facecolor": chart_bg,
+        "axes.edgecolor": grid,
+        "axes.labelcolor": contrast,
+        "axes.titlecolor": contrast,
+        "axes.grid": True,
+        "grid.color": grid,
+        "grid.linestyle": base["grid_style"],
+        "grid.alpha": base["grid_alpha"],
+        "xtick.color": contrast,
+        "ytick.color": contrast,
+        "xtick.labelcolor": contrast,
+        "ytick.labelcolor": contrast,
+        "legend.labelcolor": contrast,
+        "text.color": contrast,
+        "lines.linewidth": base["line_width"],
+        "font.size": base["font_size"],
+    }
+    return {
+        "key": (name, chart_bg),
+        "chart_bg": chart_bg,
+        "contrast": contrast,
+        "grid_color": grid,
+        "grid_style": base["grid_style"],
+        "grid_alpha": base["grid_alpha"],
+        "line_width": base["line_width"],
+        "font_size": base["font_size"],
+        "rc": rc,
+    }
+
+
+def theme_context(theme):
+    return rc_context(theme["rc"])
+
+
+def swap_colors(colors, old, new):
+    colors = np.array(colors, dtype=float).reshape(-1, 4)
+    match = np.all(np.isclose(colors[:, :3], to_rgb(old)), axis=1)
+    colors[match, :3] = to_rgb(new)
+    return colors
+
+
+def recolor_data(ax, old, new):
+    legend = ax.get_legend()
+    handles = legend.legend_handles if legend else []
+    for line in (*ax.lines, *handles):
+        if hasattr(line, "get_color") and same_color(line.get_color(), old):
+            line.set_color(new)
+    for collection in ax.collections:
+        if collection.get_gid() != "peak-labels":
+            collection.set_facecolor(swap_colors(collection.get_facecolor(), old, new))
+            collection.set_edgecolor(swap_colors(collection.get_edgecolor(), old, new))
+
+
+def style_axes(ax, theme):
+    contrast = theme["contrast"]
+    previous = getattr(ax, "chart_theme", None)
+    if previous and previous != theme["key"]:
+        old = compile_theme(*previous)["contrast"]
+        if old != contrast:
+            recolor_data(ax, old, contrast)
+    ax.set_facecolor(theme["chart_bg"])
+    for spine in ax.spines.values():
+        spine.set_color(theme["grid_color"])
+    ax.tick_params(which="both", colors=contrast, labelsize=theme["font_size"])
+    ax.grid(True, linestyle=theme["grid_style"], alpha=theme["grid_alpha"], color=theme["grid_color"])
+    for text in (ax.xaxis.label, ax.yaxis.label, ax.title, *ax.texts):
+        text.set_color(contrast)
+        text.set_fontsize(theme["font_size"])
+    legend = ax.get_legend()
+    handles = legend.legend_handles if legend else []
+    for line in (*ax.lines, *handles):
+        if hasattr(line, "set_linewidth") and hasattr(line, "get_xdata"):
+            line.set_linewidth(theme["line_width"])
+    if legend:
+        legend.get_frame().set_facecolor(theme["chart_bg"])
+        for text in legend.get_texts():
+            text.set_color(contrast)
+            text.set_fontsize(theme["font_size"])
+    for collection in ax.collections:
+        if collection.get_gid() == "peak-labels":
+            collection.set_facecolor(contrast)
+    ax.chart_theme = theme["key"]
+
+
+def clear_data(ax):
+    for artist in (*ax.lines, *ax.collections, *ax.patches, *ax.texts, *ax.images):
+        artist.remove()
+    legend = ax.get_legend()
+    if legend:
+        legend.remove()
+    ax.set_xlabel("")
+    ax.set_ylabel("")
+    for axis in (ax.xaxis, ax.yaxis):
+        axis.set_major_locator(AutoLocator())
+        axis.set_major_formatter(ScalarFormatter())
+    ax.tick_params(axis="x", labelrotation=0)
+    ax.relim()
+    ax.autoscale()
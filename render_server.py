@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from chart_colors import normalize_color
+from chart_themes import DEFAULT_THEME, THEMES, compile_theme
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_SIZE = (1000, 600)
+DEFAULT_DPI = 100
+FIGURE_POOL_SIZE = 4
+MAX_BODY_BYTES = 64 * 1024 * 1024
+METRICS_WINDOW = 4096
+CONTENT_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+chart = None
+_figures = OrderedDict()
+
+
+def optional_float(payload, key):
+    value = payload.get(key)
+    if value in (None, ""):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"{key} 需為數字") from exc
+
+
+def optional_int(payload, key, default):
+    value = payload.get(key)
+    if value in (None, ""):
+        return default
+    try:
+        number = float(value)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"{key} 需為整數") from exc
+    if not number.is_integer():
+        raise ValueError(f"{key} 需為整數")
+    return int(number)
+
+
+def payload_series(payload):
+    if payload.get("excel"):
+        x_items, x_values, x_unit, series_defs = chart.parse_excel_block(payload["excel"])
+        payload.setdefault("x_unit", x_unit)
+        series = []
+        for series_def in series_defs:
+            name, values = series_def[:2]
+            x_grid = series_def[2] if len(series_def) == 3 else None
+            series.append((name, values, x_grid, None))
+        return x_items, [float(value) for value in x_values], series
+
+    x_items = [str(item) for item in payload.get("x_items", [])]
+    x_values = [float(value) for value in payload.get("x_values", [])]
+    grid_pool = {}
+    series = []
+    for idx, item in enumerate(payload.get("series", [])):
+        name = str(item.get("name", f"序列 {idx + 1}"))
+        values = item.get("values", "")
+        if not isinstance(values, str):
+            try:
+                values = np.asarray(values, dtype=float)
+            except (TypeError, ValueError) as exc:
+                raise ValueError(f"{name} 含有非數字") from exc
+        x_grid = chart.share_x_grid(item["x"], grid_pool) if item.get("x") is not None else None
+        processing = None
+        if item.get("smooth") or item.get("baseline") is not None:
+            window = int(item["smooth"]) | 1 if item.get("smooth") else None
+            degree = int(item["baseline"]) if item.get("baseline") is not None else None
+            processing = (window, degree)
+        series.append((name, values, x_grid, processing))
+    if not series:
+        raise ValueError("請提供 series 或 excel 內容")
+    return x_items, x_values, series
+
+
+def chart_request(payload):
+    x_items, x_values, series = payload_series(payload)
+    theme_name = str(payload.get("theme") or DEFAULT_THEME)
+    if theme_name not in THEMES:
+        raise ValueError(f"不支援的主題：{theme_name}")
+    theme = compile_theme(theme_name, payload.get("chart_bg") or None)
+    chart_bg = theme["chart_bg"]
+    contrast = theme["contrast"]
+    line_color = normalize_color(payload.get("line_color") or "")
+
+    peaks = payload.get("peaks")
+    if peaks:
+        peaks = peaks if isinstance(peaks, dict) else {}
+        direction = peaks.get("direction") or chart.PEAK_DIRECTIONS[0]
+        if direction not in chart.PEAK_DIRECTIONS:
+            raise ValueError(f"不支援的峰值方向：{direction}")
+        peaks = (
+            optional_float(peaks, "prominence"),
+            optional_int(peaks, "width", 0),
+            optional_int(peaks, "max_count", 10),
+            direction,
+        )
+    derived = payload.get("derived")
+    if derived:
+        method = payload.get("resample") or chart.RESAMPLE_METHODS[0]
+        if derived not in chart.DERIVED_KINDS[1:] or method not in chart.RESAMPLE_METHODS:
+            raise ValueError(f"不支援的衍生序列：{derived}／{method}")
+        derived = (derived, method)
+    settings = chart.build_settings(
+        x_items,
+        x_values,
+        allow_negative=payload.get("allow_negative", True),
+        ymin=optional_float(payload, "ymin"),
+        ymax=optional_float(payload, "ymax"),
+        line_color=line_color,
+        contrast=contrast,
+        auto_color=payload.get("auto_color", True),
+        processed=payload.get("processed", True),
+        peaks=peaks,
+        derived=derived,
+    )
+    style = {
+        "theme": theme_name,
+        "chart_bg": chart_bg,
+        "x_unit": str(payload.get("x_unit", "")),
+        "y_unit": str(payload.get("y_unit", "")),
+        "interval": optional_float(payload, "interval"),
+    }
+    notes = [
+        (start, end, label)
+        for start, end, label, panel in chart.parse_interval_notes(str(payload.get("notes", "")))
+        if not panel
+    ]
+    return settings, series, notes, style
+
+
+def pooled_figure(width, height, dpi):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    key = (width, height, dpi)
+    figure = _figures.get(key)
+    if figure is None:
+        figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+        FigureCanvasAgg(figure)
+        figure.add_subplot(111)
+        _figures[key] = figure
+        while len(_figures) > FIGURE_POOL_SIZE:
+            _figures.popitem(last=False)
+    _figures.move_to_end(key)
+    return figure
+
+
+def render_payload(payload):
+    fmt = str(payload.get("format", "png")).lower()
+    if fmt not in CONTENT_TYPES:
+        raise ValueError(f"不支援的格式：{fmt}")
+    width = optional_int(payload, "width", DEFAULT_SIZE[0])
+    height = optional_int(payload, "height", DEFAULT_SIZE[1])
+    dpi = optional_int(payload, "dpi", DEFAULT_DPI)
+    if not (50 <= width <= 8000 and 50 <= height <= 8000 and 20 <= dpi <= 600):
+        raise ValueError("圖片尺寸或 dpi 超出範圍")
+    settings, series, notes, style = chart_request(payload)
+    figure = pooled_figure(width, height, dpi)
+    panel = chart.prepare_panel(settings, series, notes)
+    chart.draw_panel(figure.axes[0], panel, style)
+    figure.set_facecolor(style["chart_bg"])
+    buffer = BytesIO()
+    figure.savefig(buffer, format=fmt, facecolor=style["chart_bg"])
+    return buffer.getvalue()
+
+
+def init_worker():
+    global chart
+    import chart_pipeline
+
+    chart = chart_pipeline
+    render_payload({"series": [{"name": "warm", "values": [0, 1, 0.5]}], "x_items": ["a", "b", "c"], "peaks": True})
+
+
+def warm_worker(_index):
+    return os.getpid()
+
+
+class RenderMetrics:
+    def __init__(self, window=METRICS_WINDOW):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.errors = 0
+        self.samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency, ok):
+        with self._lock:
+            self.requests += 1
+            self.errors += 0 if ok else 1
+            self.samples.append((time.monotonic(), latency))
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            samples = list(self.samples)
+            requests = self.requests
+            errors = self.errors
+        recent = [stamp for stamp, _latency in samples if now - stamp <= 60]
+        latencies = sorted(latency for _stamp, latency in samples)
+
+        def percentile(fraction):
+            if not latencies:
+                return None
+            return round(latencies[min(int(fraction * len(latencies)), len(latencies) - 1)] * 1000, 2)
+
+        return {
+            "uptime_s": round(now - self.started, 1),
+            "requests_total": requests,
+            "errors_total": errors,
+            "requests_per_second": round(len(recent) / max(min(now - self.started, 60), 1e-9), 2),
+            "latency_ms": {"p50": percentile(0.5), "p90": percentile(0.9), "p99": percentile(0.99)},
+        }
+
+
+class RenderHandler(BaseHTTPRequestHandler):
+    server_version = "LineChartRender/1.0"
+
+    def send_body(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status, data):
+        self.send_body(status, json.dumps(data, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/metrics":
+            metrics = self.server.metrics.snapshot()
+            metrics["workers"] = self.server.workers
+            self.send_json(200, metrics)
+        elif path == "/health":
+            self.send_json(200, {"status": "ok"})
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/render":
+            self.send_json(404, {"error": "not found"})
+            return
+        started = time.perf_counter()
+        ok = False
+        try:
+            payload = self.read_payload(url)
+            body = self.server.pool.submit(render_payload, payload).result()
+            ok = True
+            self.send_body(200, body, CONTENT_TYPES[str(payload.get("format", "png")).lower()])
+        except ValueError as exc:
+            self.send_json(400, {"error": str(exc)})
+        except Exception as exc:
+            self.send_json(500, {"error": f"{type(exc).__name__}: {exc}"})
+        finally:
+            self.server.metrics.record(time.perf_counter() - started, ok)
+
+    def read_payload(self, url):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError("請求內容過大")
+        body = self.rfile.read(length).decode("utf-8")
+        options = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if self.headers.get_content_type() == "application/json":
+            try:
+                payload = json.loads(body or "{}")
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"JSON 格式錯誤：{exc}") from exc
+            if not isinstance(payload, dict):
+                raise ValueError("JSON 內容需為物件")
+            return {**options, **payload}
+        options["excel"] = body
+        return options
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, verbose=False):
+    workers = workers or max(1, min(4, os.cpu_count() or 1))
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+    )
+    list(pool.map(warm_worker, range(workers)))
+    server = ThreadingHTTPServer((host, port), RenderHandler)
+    server.pool = pool
+    server.workers = workers
+    server.metrics = RenderMetrics()
+    server.verbose = verbose
+    print(f"Render service on http://{host}:{server.server_address[1]} ({workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.shutdown(cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render Line Chart PNG/SVG over HTTP.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.verbose)
+
+
+if __name__ == "__main__":
+    main()
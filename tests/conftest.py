@@ -0,0 +1,118 @@
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.testing import set_font_settings_for_testing
+from matplotlib.testing.compare import compare_images
+
+import chart_pipeline
+from chart_themes import compile_theme
+
+set_font_settings_for_testing()
+
+FIXTURES = Path(__file__).parent / "fixtures"
+BASELINES = Path(__file__).parent / "baseline"
+UPDATE_BASELINES = bool(os.environ.get("LINECHART_UPDATE_BASELINES"))
+BUDGET_SCALE = float(os.environ.get("LINECHART_BUDGET_SCALE", "1"))
+IMAGE_TOLERANCE = 2.0
+
+
+def read_fixture(name):
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def synthetic_paste(rows, pairs=1, gap_every=0, seed=0):
+    rng = np.random.default_rng(seed)
+    x_values = np.linspace(4000.0, 400.0, rows)
+    columns = []
+    header = []
+    for pair in range(pairs):
+        y_values = 1 + 0.05 * np.sin(x_values / (40 + pair * 7)) + rng.normal(0, 0.002, rows)
+        y_text = np.char.mod("%.6f", y_values)
+        if gap_every:
+            y_text[gap_every // 2 :: gap_every] = ""
+        columns += [np.char.mod("%.5f", x_values), y_text]
+        header += [f"cm-1(X{pair})", f"T(Y{pair})"]
+    body = np.char.add(columns[0], "")
+    for column in columns[1:]:
+        body = np.char.add(np.char.add(body, "\t"), column)
+    return "\t".join(header) + "\n" + "\n".join(body.tolist()) + "\n"
+
+
+@contextmanager
+def timed(seconds, stage):
+    started = time.perf_counter()
+    yield
+    seconds[stage] = time.perf_counter() - started
+
+
+def run_pipeline(text, theme="dark", notes="", peaks=None, derived=None, processing=None, size=(800, 480), dpi=100):
+    seconds = {}
+    with timed(seconds, "parse"):
+        x_items, x_values, x_unit, series_defs = chart_pipeline.parse_excel_block(text)
+        series = [(name, values, x_grid, processing) for name, values, x_grid in series_defs]
+
+    with timed(seconds, "validate"):
+        problems = chart_pipeline.validate_series([item[:3] for item in series], x_items, True)
+
+    theme = compile_theme(theme)
+    settings = chart_pipeline.build_settings(x_items, x_values, contrast=theme["contrast"], peaks=peaks, derived=derived)
+    style = {
+        "theme": theme["key"][0],
+        "chart_bg": theme["chart_bg"],
+        "x_unit": x_unit,
+        "y_unit": "T",
+        "interval": None,
+    }
+    with timed(seconds, "prepare"):
+        notes = [(start, end, label) for start, end, label, _panel in chart_pipeline.parse_interval_notes(notes)]
+        panel = chart_pipeline.prepare_panel(settings, series, notes)
+
+    figure = Figure(figsize=(size[0] / dpi, size[1] / dpi), dpi=dpi)
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot(111)
+    with timed(seconds, "draw"):
+        chart_pipeline.draw_panel(ax, panel, style)
+        figure.set_facecolor(theme["chart_bg"])
+
+    with timed(seconds, "render"):
+        figure.canvas.draw()
+    return figure, panel, problems, seconds
+
+
+def assert_matches_baseline(figure, name, tmp_path, tol=IMAGE_TOLERANCE):
+    expected = BASELINES / f"{name}.png"
+    actual = tmp_path / f"{name}.png"
+    figure.savefig(actual, facecolor=figure.get_facecolor())
+    if UPDATE_BASELINES:
+        BASELINES.mkdir(exist_ok=True)
+        shutil.copyfile(actual, expected)
+        return
+    assert expected.exists(), f"缺少基準圖 {expected.name}，請以 LINECHART_UPDATE_BASELINES=1 產生"
+    result = compare_images(str(expected), str(actual), tol)
+    assert result is None, result
+
+
+def assert_within_budget(seconds, budgets):
+    over = {
+        stage: f"{seconds[stage]:.3f}s > {budget * BUDGET_SCALE:.3f}s"
+        for stage, budget in budgets.items()
+        if seconds[stage] > budget * BUDGET_SCALE
+    }
+    assert not over, f"超出時間預算：{over}"
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    chart_pipeline.clear_caches()
+    yield
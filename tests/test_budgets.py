@@ -0,0 +1,31 @@
+import time
+
+import numpy as np
+
+import chart_pipeline
+from conftest import BUDGET_SCALE, assert_within_budget, read_fixture, run_pipeline, synthetic_paste
+
+SMALL_BUDGETS = {"parse": 0.2, "validate": 0.2, "prepare": 0.2, "draw": 0.5, "render": 1.0}
+LARGE_BUDGETS = {"parse": 6.0, "validate": 1.0, "prepare": 0.5, "draw": 0.5, "render": 1.0}
+
+
+def test_readme_paste_budget():
+    run_pipeline(read_fixture("readme_paired.tsv"))
+    runs = [run_pipeline(read_fixture("readme_paired.tsv"), theme="light")[3] for _ in range(3)]
+    assert_within_budget({stage: min(run[stage] for run in runs) for stage in SMALL_BUDGETS}, SMALL_BUDGETS)
+
+
+def test_large_paste_budget():
+    _figure, _panel, _problems, seconds = run_pipeline(synthetic_paste(500_000, pairs=2, gap_every=1000))
+    assert_within_budget(seconds, LARGE_BUDGETS)
+
+
+def test_peak_width_filter_budget():
+    noise = np.random.default_rng(0).normal(size=1_000_000)
+    chart_pipeline.find_peaks(noise, width=3)
+    started = time.perf_counter()
+    peaks = chart_pipeline.find_peaks(noise, width=3, max_count=20)
+    assert time.perf_counter() - started < 0.25 * BUDGET_SCALE
+    assert len(peaks) == 20
+    small = noise[:20_000]
+    assert set(chart_pipeline.find_peaks(small, width=3)) <= set(chart_pipeline.find_peaks(small, width=3, max_count=len(small)))
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+import build_app
+
+
+@pytest.fixture
+def root(tmp_path):
+    (tmp_path / build_app.ENTRYPOINT).write_text("", encoding="utf-8")
+    (tmp_path / "sample_data.json").write_text("{}", encoding="utf-8")
+    return tmp_path
+
+
+def test_optimized_command_collects_only_used_modules(root):
+    manifest = build_app.build_manifest(root, "Windows", "optimized", None)
+    cmd = build_app.build_pyinstaller_command(root, manifest, build_app.write_build_hooks(root, manifest))
+    assert "--collect-all" not in cmd
+    assert cmd[cmd.index("--optimize") + 1] == "2"
+    assert "matplotlib.backends.backend_qtagg" in cmd and "matplotlib.tests" in cmd
+    assert "matplotlib.backends.backend_tkagg" not in manifest["excludes"]
+    assert "--onefile" in cmd and cmd[-1].endswith(build_app.ENTRYPOINT)
+    assert f"{root / 'sample_data.json'};." in cmd
+    assert manifest["data_files"] == ["sample_data.json"]
+
+
+def test_full_profile_keeps_collect_all(root):
+    manifest = build_app.build_manifest(root, "Darwin", "full", None)
+    cmd = build_app.build_pyinstaller_command(root, manifest, build_app.write_build_hooks(root, manifest))
+    assert cmd[cmd.index("--collect-all") + 1] == "matplotlib"
+    assert "--optimize" not in cmd and "--onefile" not in cmd
+    assert not (root / build_app.ASSET_DIR).exists()
+
+
+def test_data_hook_prunes_sample_data(root):
+    manifest = build_app.build_manifest(root, "Windows", "optimized", None)
+    hooks_dir = build_app.write_build_hooks(root, manifest)
+    hook = (hooks_dir / "hook-matplotlib.py").read_text(encoding="utf-8")
+    compile(hook, "hook-matplotlib.py", "exec")
+    assert "**/sample_data" in hook
+    assert 'collect_delvewheel_libs_directory("matplotlib"' in hook
+
+
+def test_dry_run_prints_command_and_manifest(root, monkeypatch, capsys):
+    monkeypatch.setattr(build_app, "__file__", str(root / "build_app.py"))
+    assert build_app.main(["--dry-run", "--system", "Windows", "--profile", "optimized"]) == 0
+    out = capsys.readouterr().out
+    command = next(line for line in out.splitlines() if line.startswith("Command:"))
+    assert "--exclude-module" in command and "--additional-hooks-dir" in command
+    manifest = json.loads(out[out.index("{") :])
+    assert manifest["profile"] == "optimized" and manifest["env"] == build_app.BUILD_ENV
+
+
+def test_full_profile_is_default():
+    assert build_app.parse_args([]).profile == "full"
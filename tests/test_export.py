@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+import chart_export
+import chart_pipeline
+
+
+def interleaved_series():
+    first = chart_pipeline.XGrid(np.linspace(4000, 400, 11))
+    second = chart_pipeline.XGrid([1.0, 2.0, 4.0, 8.0])
+    return [
+        ("s0", first, np.arange(11.0)),
+        ("s1", second, np.array([0.1, 0.2, np.nan, 0.4])),
+        ("s2", first, np.arange(11.0) / 3),
+    ]
+
+
+def test_npz_round_trip_with_interleaved_grids(tmp_path):
+    series = interleaved_series()
+    path = tmp_path / "data.npz"
+    chart_export.write_series_npz(str(path), series)
+    with np.load(path) as data:
+        for idx, (name, x_grid, y_values) in enumerate(series):
+            assert data["names"][idx] == name
+            np.testing.assert_array_equal(data[f"y_{idx}"], y_values)
+            np.testing.assert_array_equal(data[f"x_{data['grid_index'][idx]}"], x_grid.values)
+
+
+@pytest.mark.parametrize("arrow", [True, False])
+def test_csv_keeps_full_precision(tmp_path, monkeypatch, arrow):
+    if arrow and chart_export.pyarrow is None:
+        pytest.skip("pyarrow not installed")
+    if not arrow:
+        monkeypatch.setattr(chart_export, "pyarrow", None)
+    series = interleaved_series()
+    path = tmp_path / "data.csv"
+    chart_export.write_series_csv(str(path), series, chunk_rows=3)
+    with open(path, encoding="utf-8-sig") as handle:
+        header = handle.readline().strip().split(",")
+        rows = [line.rstrip("\n").split(",") for line in handle]
+    assert header == ["X1", "s0", "s2", "X2", "s1"]
+    assert len(rows) == 11
+    columns = [[float(cell) for cell in column if cell] for column in zip(*rows)]
+    np.testing.assert_array_equal(columns[2], series[2][2])
+    np.testing.assert_array_equal(columns[0], series[0][1].values)
+    np.testing.assert_array_equal(columns[4], series[1][2])
+    assert rows[-1][3:] == ["", ""]
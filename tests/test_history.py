@@ -0,0 +1,22 @@
+import chart_history
+
+
+def state(value, drawn=False):
+    return chart_history.ChartState((value,), ("",), (), drawn)
+
+
+def test_undo_keeps_checkpoint_equal_to_current():
+    history = chart_history.ChartHistory()
+    history.record(state("a"))
+    assert history.undo(state("a")) is None
+    assert history.latest == state("a")
+    history.record(state("b"))
+    assert history.undo(state("b")) == state("a")
+    assert history.redo(state("a")) == state("b")
+
+
+def test_undo_returns_checkpoint_before_unsaved_edit():
+    history = chart_history.ChartHistory()
+    history.record(state("a"))
+    assert history.undo(state("edited")) == state("a")
+    assert history.redo(state("a")) == state("edited")
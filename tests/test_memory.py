@@ -0,0 +1,58 @@
+import numpy as np
+
+import chart_pipeline
+
+
+def test_monitor_tracks_stages_and_series():
+    monitor = chart_pipeline.MemoryMonitor(budget_mb=1)
+    monitor.track("輸入文字", 300 * 1024)
+    monitor.track_series("A", 2 * 1024 * 1024)
+    monitor.track("序列數值", sum(monitor.series.values()))
+    assert monitor.over_budget()
+    assert monitor.details() == ["序列數值：2 MB", "序列 A：2 MB"]
+    assert chart_pipeline.series_nbytes("1,2,3") == 5 * chart_pipeline.TEXT_COPY_FACTOR + 24
+
+
+def test_stored_values_feed_the_pipeline(tmp_path):
+    values = np.sin(np.linspace(0, 20, 5000))
+    values[100:120] = np.nan
+    stored = chart_pipeline.StoredValues(values, str(tmp_path))
+    assert stored == chart_pipeline.StoredValues(values, str(tmp_path))
+    assert chart_pipeline.series_nbytes(stored) == 0
+    assert isinstance(stored.values, np.memmap)
+    assert not chart_pipeline.check_series("s", stored, chart_pipeline.XGrid(np.arange(5000.0)), (), True)
+    panel = chart_pipeline.prepare_panel(chart_pipeline.build_settings(), [("s", stored, chart_pipeline.XGrid(np.arange(5000.0)), (7, None))], [])
+    np.testing.assert_array_equal(np.isnan(panel["lines"][0][1]), np.isnan(values))
+    assert isinstance(panel["lines"][0][0], np.ndarray) and panel["xlim"] == (0.0, 4999.0)
+
+
+def test_decimated_panel_keeps_extremes():
+    x_values = np.arange(1_000_000.0)
+    y_values = np.random.default_rng(1).normal(size=1_000_000)
+    panel = {"lines": [(x_values, y_values, "s", "#fff", None)], "peaks": None}
+    small = chart_pipeline.decimate_panel(panel, points=1000)["lines"][0]
+    assert len(small[1]) <= 2000
+    assert small[1].max() == y_values.max() and small[1].min() == y_values.min()
+    assert chart_pipeline.panel_nbytes({"lines": [small], "peaks": None}) < chart_pipeline.panel_nbytes(panel) / 100
+
+
+def test_memo_cache_evicts_least_recent_over_byte_budget():
+    cache = chart_pipeline.MemoCache(max_bytes=100)
+    cache.put("a", 1, 40)
+    cache.put("b", 2, 40)
+    assert cache.get("a") == 1
+    cache.put("c", 3, 40)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.nbytes == 80
+    cache.put("a", 4, 90)
+    assert cache.get("c") is None and cache.get("a") == 4 and cache.nbytes == 90
+
+
+def test_cache_key_hashes_large_data_by_digest():
+    values = ",".join(["1.5"] * 200_000)
+    grid = chart_pipeline.XGrid(np.arange(200_000.0))
+    key = (chart_pipeline.build_settings(x_items=[str(idx) for idx in range(200_000)]), [("s", values, grid, None)], [])
+    assert len(repr(chart_pipeline.key_part(key))) < 2000
+    assert chart_pipeline.cache_key(key) == chart_pipeline.cache_key(key)
+    changed = (key[0], [("s", values[:-1] + "6", grid, None)], [])
+    assert chart_pipeline.cache_key(changed) != chart_pipeline.cache_key(key)
@@ -0,0 +1,169 @@
+import numpy as np
+import pytest
+from matplotlib.colors import to_rgba
+
+import chart_pipeline
+from chart_themes import compile_theme, style_axes
+from conftest import assert_matches_baseline, read_fixture, run_pipeline, synthetic_paste
+
+
+def test_readme_xy_paste():
+    x_items, x_values, x_unit, series_defs = chart_pipeline.parse_excel_block(read_fixture("readme_xy.tsv"))
+    assert x_unit == "cm-1(X)"
+    assert x_items == []
+    assert len(series_defs) == 1
+    _name, values, x_grid = series_defs[0]
+    assert values.split(",")[0] == "1.0051"
+    assert len(x_grid) == 6 and not x_grid.ascending and x_grid.first == 3997.43665
+
+
+def test_readme_paired_paste():
+    x_items, x_values, x_unit, series_defs = chart_pipeline.parse_excel_block(read_fixture("readme_paired.tsv"))
+    assert x_unit == "cm-1(X)"
+    assert [name for name, _values, _grid in series_defs] == ["T(Y)", "T(Y1)"]
+    assert x_items == [] and x_values == []
+    assert len(series_defs[0][2]) == 7
+    grid = series_defs[1][2]
+    assert grid.uniform and grid.bounds == (3994.0, 4000.0)
+
+
+def test_blank_cells_stay_aligned():
+    text = "X1\tA\tX2\tB\n1\t10\t1\t5\n2\t\t2\t6\n3\t30\t3\t7\n4\t40\t4\t\n5\t50\t5\t9\n"
+    _x_items, _x_values, _x_unit, series_defs = chart_pipeline.parse_excel_block(text)
+    values, bad_rows = chart_pipeline.parse_series_values(series_defs[0][1])
+    assert not len(bad_rows)
+    np.testing.assert_array_equal(np.isnan(values), [False, True, False, False, False])
+    assert len(series_defs[1][2]) == 5
+
+
+def test_validation_reports_rows():
+    problems = chart_pipeline.check_series("s", "1,x,3", None, ["a", "b", "c", "d"], False)
+    assert ("s", 2, "含有非數字") in problems
+    assert any(row == 4 for _label, row, _message in problems)
+
+
+@pytest.mark.parametrize(
+    "name, fixture, options",
+    [
+        ("readme_xy", "readme_xy.tsv", {}),
+        ("readme_paired", "readme_paired.tsv", {"notes": "3990,3995,band"}),
+        ("readme_paired_light", "readme_paired.tsv", {"theme": "light"}),
+    ],
+)
+def test_readme_chart_matches_baseline(name, fixture, options, tmp_path):
+    figure, _panel, problems, _seconds = run_pipeline(read_fixture(fixture), **options)
+    assert not problems
+    assert_matches_baseline(figure, name, tmp_path)
+
+
+def test_gapped_peaks_chart_matches_baseline(tmp_path):
+    text = synthetic_paste(400, pairs=2, gap_every=97)
+    figure, panel, problems, _seconds = run_pipeline(text, theme="print", peaks=(None, 0, 6, "自動"), processing=(9, None))
+    assert not problems
+    assert all(np.isnan(y_values).any() for _x, y_values, *_rest in panel["lines"])
+    assert_matches_baseline(figure, "synthetic_gaps_peaks", tmp_path)
+
+
+def test_gaps_survive_decimation():
+    figure, panel, problems, _seconds = run_pipeline(synthetic_paste(100_000, gap_every=1000))
+    assert not problems
+    (line,) = figure.axes[0].get_lines()
+    assert len(line.get_ydata()) < 20_000
+    assert np.isnan(line.get_ydata()).sum() == np.isnan(panel["lines"][0][1]).sum() == 100
+
+
+def test_large_chart_matches_baseline(tmp_path):
+    figure, panel, problems, _seconds = run_pipeline(synthetic_paste(200_000, pairs=2))
+    assert not problems
+    assert all(len(line.get_xdata()) < 20_000 for line in figure.axes[0].get_lines())
+    assert_matches_baseline(figure, "synthetic_large", tmp_path)
+
+
+def test_equal_grids_from_separate_parses_are_shared():
+    first = chart_pipeline.parse_excel_block(read_fixture("readme_paired.tsv"))[3]
+    second = chart_pipeline.parse_excel_block(read_fixture("readme_paired.tsv") + "\n")[3]
+    pool = {}
+    shared = [chart_pipeline.share_x_grid(x_grid, pool) for _name, _values, x_grid in first + second]
+    assert shared[0] is shared[2] and shared[1] is shared[3]
+    assert len(pool) == 2
+
+
+def test_uniform_grid_materialises_once():
+    grid = chart_pipeline.XGrid(np.linspace(4000, 400, 10_001))
+    assert grid.uniform and grid.bounds == (400.0, 4000.0)
+    assert grid.values is grid.values
+    assert not grid.values.flags.writeable
+    np.testing.assert_array_equal(grid.values, np.linspace(4000, 400, 10_001))
+
+
+def test_near_uniform_grid_keeps_pasted_values():
+    pasted = np.round(3997.43665 - 1.42308 * np.arange(1000), 5)
+    grid = chart_pipeline.XGrid(pasted)
+    assert not grid.uniform
+    np.testing.assert_array_equal(grid.values, pasted)
+
+
+def test_crowded_peak_labels_do_not_overlap():
+    centers = np.array([10.0, 14.0, 18.0, 22.0, 26.0, 30.0, 80.0, 20.0])
+    widths = np.full(len(centers), 20.0)
+    below = np.array([False] * 7 + [True])
+    tiers = chart_pipeline.label_tiers(centers, widths, below)
+    assert tiers[-1] == 0 and tiers[6] == 0
+    for first in range(len(centers)):
+        for second in range(first + 1, len(centers)):
+            if tiers[first] == tiers[second] and below[first] == below[second]:
+                assert abs(centers[first] - centers[second]) >= widths[first] + 2
+
+
+def test_theme_switch_recolours_contrast_artists():
+    figure, _panel, _problems, _seconds = run_pipeline(
+        read_fixture("readme_paired.tsv"), derived=("差值", "內插"), peaks=(None, 0, 6, "自動")
+    )
+    ax = figure.axes[0]
+    dark, light = compile_theme("dark")["contrast"], compile_theme("print")["contrast"]
+    assert ax.lines[-1].get_color() == dark
+    style_axes(ax, compile_theme("print"))
+    handles = [handle for handle in ax.get_legend().legend_handles if hasattr(handle, "get_color")]
+    assert ax.lines[-1].get_color() == light and handles[-1].get_color() == light
+    assert ax.lines[0].get_color() != light
+    assert all(line.get_linewidth() == 1.2 for line in [*ax.lines, *handles])
+    assert ax.xaxis.label.get_fontsize() == 11
+    np.testing.assert_allclose(ax.collections[0].get_edgecolor()[0], to_rgba(light))
+
+
+@pytest.mark.parametrize("text", [read_fixture("readme_paired.tsv"), synthetic_paste(2000, pairs=2, gap_every=97)])
+def test_chunked_paired_parse_matches_full_parse(text):
+    _x_items, _x_values, x_unit, series_defs = chart_pipeline.parse_excel_block(text)
+    chunked_unit, chunked = chart_pipeline.parse_paired_columns(text, chunk_chars=1000)
+    assert chunked_unit == x_unit
+    assert [name for name, _values, _grid in chunked] == [name for name, _values, _grid in series_defs]
+    for (_name, values, x_grid), (_same, text_values, text_grid) in zip(chunked, series_defs):
+        np.testing.assert_array_equal(values, chart_pipeline.parse_series_values(text_values)[0])
+        assert x_grid.digest == text_grid.digest
+    assert chart_pipeline.parse_paired_columns("名稱\ta\tb\nA\t1\t2\nB\t3\t4\n") is None
+
+
+def test_pasted_grid_is_the_x_source():
+    text = "X\tA\n" + "".join(f"{x}\t{x % 7}\n" for x in range(10, 20))
+    x_items, x_values, _x_unit, series_defs = chart_pipeline.parse_excel_block(text)
+    series = [(name, values, x_grid, None) for name, values, x_grid in series_defs]
+    panel = chart_pipeline.prepare_panel(chart_pipeline.build_settings(x_items, x_values), series, [("10", "12", "b")])
+    assert panel["numeric_x"] and panel["bands"][0][:2] == (10.0, 12.0)
+    assert panel["lines"][0][0] is series_defs[0][2].values
+
+
+def test_peak_labels_repack_on_zoom():
+    x_values = np.linspace(0, 1000, 20_001)
+    y_values = sum(np.exp(-((x_values - center) / 0.2) ** 2) for center in (10, 11, 12, 13))
+    text = "X\tA\n" + "\n".join(f"{x:g}\t{y:.6f}" for x, y in zip(x_values, y_values))
+    figure, _panel, _problems, _seconds = run_pipeline(text, peaks=(0.5, 0, 4, "向上峰"))
+    ax = figure.axes[0]
+    (labels,) = [collection for collection in ax.collections if collection.get_gid() == "peak-labels"]
+
+    def lifts():
+        text_paths = labels.peak_labels[3]
+        return {round(path.vertices[0, 1] - text.vertices[0, 1], 3) for path, text in zip(labels.get_paths(), text_paths)}
+
+    assert len(lifts()) > 1
+    ax.set_xlim(9, 14)
+    assert len(lifts()) == 1
@@ -0,0 +1,36 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import render_server
+
+ROOT = Path(__file__).parent.parent
+
+
+def test_worker_renders_without_tkinter():
+    script = (
+        "import sys, render_server\n"
+        "render_server.init_worker()\n"
+        "image = render_server.render_payload({'excel': open(sys.argv[1], encoding='utf-8').read(), 'peaks': True})\n"
+        "assert image.startswith(b'\\x89PNG')\n"
+        "assert 'tkinter' not in sys.modules and 'Line_chart' not in sys.modules\n"
+    )
+    fixture = ROOT / "tests" / "fixtures" / "readme_paired.tsv"
+    subprocess.run([sys.executable, "-c", script, str(fixture)], cwd=ROOT, check=True)
+
+
+def test_svg_payload():
+    render_server.init_worker()
+    image = render_server.render_payload({"series": [{"name": "A", "values": [1, 3, 2]}], "x_items": ["a", "b", "c"], "format": "svg"})
+    assert image.lstrip().startswith(b"<?xml")
+
+
+def test_bad_numeric_fields_are_value_errors():
+    render_server.init_worker()
+    payload = {"series": [{"name": "A", "values": [1, 3, 2]}], "x_items": ["a", "b", "c"]}
+    assert render_server.render_payload({**payload, "peaks": {"width": None, "max_count": "5"}}).startswith(b"\x89PNG")
+    for bad in ({"peaks": {"width": "wide"}}, {"peaks": {"max_count": 2.5}}, {"peaks": {"direction": "x"}}, {"dpi": [1]}):
+        with pytest.raises(ValueError):
+            render_server.render_payload({**payload, **bad})
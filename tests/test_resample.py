@@ -0,0 +1,56 @@
+import time
+
+import numpy as np
+import pytest
+
+import chart_pipeline
+from conftest import BUDGET_SCALE, assert_matches_baseline, read_fixture, run_pipeline
+
+
+def test_interp_keeps_gaps_and_bounds():
+    x_values = np.array([4.0, 3.0, 2.0, 1.0, 0.0])
+    y_values = np.array([4.0, 3.0, np.nan, 1.0, 0.0])
+    result = chart_pipeline.align_series(x_values, y_values, [-1, 0, 0.5, 1.5, 2.5, 3.5, 4, 5])
+    np.testing.assert_array_equal(np.isnan(result), [True, False, False, True, True, False, False, True])
+    np.testing.assert_allclose(result[[1, 2, 5, 6]], [0.0, 0.5, 3.5, 4.0])
+
+
+def test_window_mean_averages_dense_source():
+    mapping = chart_pipeline.GridMap(np.arange(10.0), [0.0, 5.0, 9.0], chart_pipeline.RESAMPLE_METHODS[1])
+    np.testing.assert_allclose(mapping.apply(np.arange(10.0)), [1.0, 4.5, 8.0])
+
+
+def test_grid_map_is_cached():
+    source = chart_pipeline.XGrid(np.linspace(0, 10, 101))
+    target = chart_pipeline.XGrid(np.linspace(10, 0, 37))
+    assert chart_pipeline.grid_map(source, target) is chart_pipeline.grid_map(source, target)
+
+
+@pytest.mark.parametrize(
+    "kind, expected",
+    [("差值", -0.5), ("比值", 0.8), ("平均", 2.25)],
+)
+def test_derived_series_on_different_grids(kind, expected):
+    fine = chart_pipeline.XGrid(np.linspace(0, 100, 1001))
+    coarse = chart_pipeline.XGrid(np.linspace(100, 0, 51))
+    _name, values = chart_pipeline.derive_series(kind, [("A", fine, np.full(1001, 2.0)), ("B", coarse, np.full(51, 2.5))])
+    assert len(values) == 1001
+    np.testing.assert_allclose(values, expected)
+
+
+def test_derived_series_budget():
+    count = 1_000_000
+    first = chart_pipeline.XGrid(np.linspace(4000, 400, count))
+    second = chart_pipeline.XGrid(np.linspace(4100, 300, count + count // 3))
+    items = [("A", first, np.sin(first.values / 50)), ("B", second, np.cos(second.values / 50))]
+    chart_pipeline.derive_series("差值", items)
+    for kind in chart_pipeline.DERIVED_KINDS[1:]:
+        started = time.perf_counter()
+        chart_pipeline.derive_series(kind, items)
+        assert time.perf_counter() - started < 0.1 * BUDGET_SCALE
+
+
+def test_readme_difference_matches_baseline(tmp_path):
+    figure, panel, _problems, _seconds = run_pipeline(read_fixture("readme_paired.tsv"), derived=("差值", "內插"))
+    assert panel["lines"][-1][2] == "T(Y) − T(Y1)"
+    assert_matches_baseline(figure, "readme_paired_difference", tmp_path)
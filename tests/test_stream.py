@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+import chart_stream
+
+
+def test_ring_buffer_wraps_and_keeps_latest_values():
+    ring = chart_stream.RingBuffer(4)
+    ring.extend([1, 2, 3])
+    assert ring.view().tolist() == [1, 2, 3]
+    ring.extend([4, 5, 6])
+    assert ring.view().tolist() == [3, 4, 5, 6]
+    ring.extend(np.arange(10, 20))
+    assert ring.view().tolist() == [16, 17, 18, 19]
+    assert ring.size == 4
+
+
+def test_stream_series_snapshot_keeps_rolling_window():
+    series = chart_stream.StreamSeries("a", capacity=8)
+    series.append(np.arange(12), np.arange(12) * 10)
+    x_values, y_values = series.snapshot()
+    assert x_values.tolist() == list(range(4, 12))
+    x_values, y_values = series.snapshot(window=3)
+    assert x_values.tolist() == [8, 9, 10, 11]
+    assert y_values.tolist() == [80, 90, 100, 110]
+    with pytest.raises(ValueError):
+        series.append([1, 2], [1])
+
+
+def test_file_tail_buffers_partial_lines(tmp_path):
+    path = tmp_path / "live.tsv"
+    path.write_bytes(b"time\tA\t\n1\t2\t3\n4\t5")
+    source = chart_stream.FileTailSource(str(path))
+    assert source.read().tolist() == [[1, 2, 3]]
+    assert source.names == ["A", "序列 2"]
+    assert source.read() is None
+    with open(path, "ab") as handle:
+        handle.write(b"\t6\n")
+    assert source.read().tolist() == [[4, 5, 6]]
+
+
+def test_file_tail_without_header_numbers_series(tmp_path):
+    path = tmp_path / "live.tsv"
+    path.write_text("0\t1\t2\n1\t3\t4\n", encoding="utf-8")
+    source = chart_stream.FileTailSource(str(path))
+    assert source.read().tolist() == [[0, 1, 2], [1, 3, 4]]
+    assert source.names == ["序列 1", "序列 2"]
+    path.write_text("2\t5\t6\n", encoding="utf-8")
+    assert source.read().tolist() == [[2, 5, 6]]